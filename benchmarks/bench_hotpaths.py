@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+
+""" Regression benchmark for the in process hot paths of the F5 LTM tools,
+    'create_virt_dict', 'xref_pools' and the .csv writers behind 'write_api'
+    and 'write_poolmem_stats'.
+
+    Deterministic synthetic iControl JSON is generated for each scale, with
+    1 to 64 members per pool, weighted towards small pools. Each function is
+    timed (best of 'REPEATS' runs, the least disturbed by the rest of the
+    machine) and its peak memory measured with tracemalloc in a separate
+    run, then compared against the stored baseline. Times are scaled by a
+    fixed calibration workload timed in the same run, so a machine that is
+    busier or slower than when the baseline was saved does not look like a
+    regression. A time or peak memory over the baseline by more than
+    'THRESHOLD' is flagged as a regression.
+
+    Run from the top level directory:
+
+        python benchmarks/bench_hotpaths.py                 compare
+        python benchmarks/bench_hotpaths.py --full          add 100k VIPs
+        python benchmarks/bench_hotpaths.py --save-baseline store baseline
+        python benchmarks/bench_hotpaths.py --full --save-baseline
+        python benchmarks/bench_hotpaths.py --threshold=0.5 allow 50%
+
+    Exits with a non-zero status if any function has regressed. Baselines
+    are machine specific, save one on the machine that compares against it.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+import sys
+import json
+import time
+import random
+import tracemalloc
+
+
+# Virtual servers generated for each scale, '--full' adds the largest
+SCALES = [1000, 10000]
+FULL_SCALES = SCALES + [100000]
+
+# Members per pool are picked between these, inclusive, weighted by
+# 1 / members ** MEMBER_SKEW as most pools are small (about 6 on average).
+# This also keeps the 100k scale within a few GB of memory.
+MIN_MEMBERS = 1
+MAX_MEMBERS = 64
+MEMBER_SKEW = 1.5
+
+# Share of virtual servers without a pool, and of pools with traffic
+NO_POOL_RATIO = 0.05
+ACTIVE_RATIO = 0.3
+
+SEED = 1019
+
+# Timed runs per function, the best is kept
+REPEATS = 5
+
+# Allowed increase over the baseline before flagging a regression, times
+# must also be slower by at least 'MIN_SLOWER' seconds so timer noise on the
+# smallest cases is not flagged
+THRESHOLD = 0.25
+MIN_SLOWER = 0.005
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(REPO_DIR, 'benchmarks',
+                             'baseline_hotpaths.json')
+
+POOL_REF_PREFIX = 'https://localhost/mgmt/tm/ltm/pool/members/'
+
+
+def member_entry(pool_ref, addr, port, value):
+
+    """ Returns one pool member entry of the 'pool/members/stats' response """
+
+    mem_ref = (POOL_REF_PREFIX + pool_ref + '/members/~Common~' + addr + ':'
+               + str(port) + '/stats')
+    entries = {'addr': {'description': addr},
+               'port': {'value': port},
+               'nodeName': {'description': '/Common/' + addr},
+               'serverside.bitsIn': {'value': value * 8000},
+               'serverside.bitsOut': {'value': value * 64000},
+               'serverside.curConns': {'value': value % 7},
+               'serverside.maxConns': {'value': value % 50},
+               'serverside.pktsIn': {'value': value * 10},
+               'serverside.pktsOut': {'value': value * 12},
+               'serverside.totConns': {'value': value}}
+
+    return mem_ref, {'nestedStats': {'entries': entries}}
+
+
+def generate(virt_count, seed=SEED):
+
+    """ Returns deterministic synthetic 'virtual' and 'pool/members/stats'
+        responses with 'virt_count' virtual servers, one pool each.
+    """
+
+    # Intialise variables
+    rng = random.Random(seed)
+    items = []
+    entries = {}
+    member_counts = range(MIN_MEMBERS, MAX_MEMBERS + 1)
+    member_weights = [1 / count ** MEMBER_SKEW for count in member_counts]
+
+    for index in range(virt_count):
+        virt = {'name': 'vs_{}'.format(index),
+                'partition': 'Common',
+                'fullPath': '/Common/vs_{}'.format(index),
+                'destination': '/Common/10.{}.{}.{}:443'.format(
+                    index >> 16 & 255, index >> 8 & 255, index & 255),
+                'description': 'Synthetic virtual server {}'.format(index)}
+        items.append(virt)
+        if rng.random() < NO_POOL_RATIO:
+            continue
+
+        pool_name = '/Common/pool_{}'.format(index)
+        pool_ref = pool_name.replace('/', '~')
+        virt['pool'] = pool_name
+        active = rng.random() < ACTIVE_RATIO
+
+        members = {}
+        for member in range(rng.choices(member_counts,
+                                        member_weights)[0]):
+            addr = '172.{}.{}.{}'.format(index >> 8 & 255, index & 255,
+                                         member)
+            value = rng.randint(1, 100000) if active else 0
+            mem_ref, entry = member_entry(pool_ref, addr, 8443, value)
+            members[mem_ref] = entry
+
+        entries[POOL_REF_PREFIX + pool_ref + '/stats'] = {'nestedStats': {
+            'entries': {POOL_REF_PREFIX + pool_ref + '/members/stats': {
+                'nestedStats': {'entries': members}}}}}
+
+    return {'items': items}, {'entries': entries}
+
+
+def measure(func, setup, repeats=REPEATS):
+
+    """ Returns the best seconds of 'func(*setup())' over the repeats and
+        its peak traced memory in MB from one more run. 'setup' is called
+        before each run, outside the measurement.
+    """
+
+    # Intialise variables
+    times = []
+
+    for repeat in range(repeats):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+
+    args = setup()
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return min(times), peak / 1000000
+
+
+def calibration_work():
+
+    """ Fixed pure Python workload of dictionary, string and list work, the
+        mix the hot paths are made of.
+    """
+
+    # Intialise variables
+    table = {}
+    lines = []
+
+    for index in range(200000):
+        key = 'member_{}'.format(index)
+        table[key] = {'value': index, 'name': key.upper()}
+    for key, values in table.items():
+        lines.append(','.join([key, values['name'], str(values['value'])]))
+
+    return lines
+
+
+def calibrate():
+
+    """ Returns the best seconds of the calibration workload """
+
+    # Intialise variables
+    times = []
+
+    for repeat in range(REPEATS):
+        start = time.perf_counter()
+        calibration_work()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def bench_scale(virt_count):
+
+    """ Benchmarks the hot paths at one scale, returning a dictionary of
+        case name to seconds and peak MB.
+    """
+
+    from f5ltm.engine import (create_virt_dict, xref_pools, write_virt_csv,
+                              write_poolmem_csv)
+
+    # Intialise variables
+    results = {}
+    ltm_virt, ltm_stats = generate(virt_count)
+
+    # The writers write to the null device, so the times are of the writers
+    # and not of the disk
+    virt_csv = poolmem_csv = os.devnull
+
+    # 'xref_pools' adds the members to the passed dictionary, so each run
+    # gets a fresh one
+    virt_dict = create_virt_dict(ltm_virt)
+    xref_pools(virt_dict, ltm_stats)
+
+    cases = [('create_virt_dict', create_virt_dict, lambda: (ltm_virt,)),
+             ('xref_pools', xref_pools,
+              lambda: (create_virt_dict(ltm_virt), ltm_stats)),
+             ('write_api', write_virt_csv, lambda: (virt_dict, virt_csv)),
+             ('write_poolmem_stats', write_poolmem_csv,
+              lambda: (virt_dict, poolmem_csv))]
+
+    for name, func, setup in cases:
+        seconds, peak_mb = measure(func, setup)
+        results['{}/{}'.format(name, virt_count)] = {'seconds': seconds,
+                                                     'peak_mb': peak_mb}
+
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+
+    """ Prints each case against its baseline and returns True if any case
+        regressed by more than the threshold. Times are scaled by the ratio
+        of the baseline's calibration to this run's.
+    """
+
+    # Intialise variables
+    regressed = False
+    scale = 1.0
+    if '_calibration' in baseline:
+        scale = (baseline['_calibration']['seconds']
+                 / results['_calibration']['seconds'])
+
+    for case, result in results.items():
+        if case == '_calibration':
+            continue
+        base = baseline.get(case)
+        result = {'seconds': result['seconds'] * scale,
+                  'peak_mb': result['peak_mb']}
+        line = (f"{case:<30}{result['seconds'] * 1000:>10.1f} ms"
+                f"{result['peak_mb']:>10.1f} MB")
+        if base is None:
+            print(line + '    no baseline')
+            continue
+
+        time_change = result['seconds'] / base['seconds'] - 1
+        mem_change = result['peak_mb'] / max(base['peak_mb'], 0.001) - 1
+        status = 'OK'
+        slower = result['seconds'] - base['seconds']
+        if ((time_change > threshold and slower > MIN_SLOWER)
+                or mem_change > threshold):
+            status = 'REGRESSION'
+            regressed = True
+        print(line + f"{time_change:>+9.0%}{mem_change:>+9.0%}    {status}")
+
+    return regressed
+
+
+def main():
+
+    """ Main Program """
+
+    scales = FULL_SCALES if '--full' in sys.argv else SCALES
+    sys.path.insert(0, REPO_DIR)
+
+    # Intialise variables
+    results = {}
+    threshold = THRESHOLD
+    calibrations = [calibrate()]
+
+    for arg in sys.argv[1:]:
+        if arg.startswith('--threshold='):
+            threshold = float(arg.partition('=')[2])
+
+    for virt_count in scales:
+        results.update(bench_scale(virt_count))
+        calibrations.append(calibrate())
+
+    # The machine at its least busy during the run
+    results['_calibration'] = {'seconds': min(calibrations), 'peak_mb': 0.0}
+
+    if '--save-baseline' in sys.argv:
+        baseline = {}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE) as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(BASELINE_FILE, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print('Baseline saved to', BASELINE_FILE)
+        return
+
+    try:
+        with open(BASELINE_FILE) as file:
+            baseline = json.load(file)
+    except OSError:
+        baseline = {}
+
+    print(f"{'Case':<30}{'Time':>13}{'Peak':>13}{'Time':>9}{'Peak':>9}")
+    regressed = compare(results, baseline, threshold)
+    print(f"\nThreshold: {threshold:.0%} over the baseline, times scaled "
+          f"by the calibration")
+
+    if regressed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+
+    main()
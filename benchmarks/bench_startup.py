@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+""" Startup time benchmark for the F5 LTM tools.
+
+    Imports each entry point script in a fresh interpreter with
+    'python -X importtime', takes the median cumulative import time over a
+    number of runs and checks it against the startup budget. The slowest
+    imports are listed so a new eager import is easy to spot.
+
+    Run from the top level directory:
+
+        python benchmarks/bench_startup.py
+
+    Exits with a non-zero status if any entry point is over budget.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+import sys
+import statistics
+import subprocess
+
+
+# Target budget for importing an entry point, in milliseconds
+STARTUP_BUDGET_MS = 25
+
+# Number of fresh interpreters to time each entry point over
+RUNS = 5
+
+# Number of slowest imports to list per entry point
+TOP_IMPORTS = 5
+
+ENTRY_POINTS = ['f5_ltm_stats', 'f5_ltm_stats_token_call', 'f5api_call',
+                'f5api_token_call', 'get_f5_token', 'f5_ltm_fleet_stats',
+                'f5_ltm_snapshot_report', 'f5_member_lookup',
+                'f5_ltm_distributed']
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):
+
+    """ Imports the module in a fresh interpreter and returns its cumulative
+        import time, and a list of (name, self time) for each module it
+        imported, in microseconds.
+    """
+
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                             'import ' + module],
+                            cwd=REPO_DIR, capture_output=True, text=True,
+                            check=True)
+
+    # Intialise variables
+    nested = []
+
+    # Lines are 'import time:  self [us] | cumulative | imported package',
+    # nested imports are indented and listed before the importing module
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if name.strip() == module:
+            return int(cumulative_us), nested
+        if name.startswith('  '):
+            nested.append((name.strip(), int(self_us)))
+        else:
+            nested = []
+
+    raise SystemExit('No import time reported for ' + module)
+
+
+def bench_module(module, runs=RUNS):
+
+    """ Returns the median cumulative import time of the module in
+        milliseconds, and the slowest imports of the last run.
+    """
+
+    # Intialise variables
+    cumulative = []
+
+    for run in range(runs):
+        cumulative_us, nested = import_times(module)
+        cumulative.append(cumulative_us / 1000)
+
+    slowest = sorted(nested, key=lambda item: item[1],
+                     reverse=True)[:TOP_IMPORTS]
+
+    return statistics.median(cumulative), slowest
+
+
+def main():
+
+    """ Main Program """
+
+    over_budget = False
+
+    for module in ENTRY_POINTS:
+        median_ms, slowest = bench_module(module)
+        status = 'OK' if median_ms <= STARTUP_BUDGET_MS else 'OVER BUDGET'
+        if median_ms > STARTUP_BUDGET_MS:
+            over_budget = True
+
+        print(f"{module:<28}{median_ms:>8.1f} ms{'':<4}{status}")
+        for name, self_us in slowest:
+            print(f"{'':<4}{name:<40}{self_us / 1000:>8.1f} ms self")
+
+    print(f"\nBudget: {STARTUP_BUDGET_MS} ms per entry point")
+
+    if over_budget:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+
+""" Distributed collection of a fleet of F5 LTMs. Run as the coordinator to
+    queue the devices in an inventory file, as a worker on each collector
+    host to collect them, then merge the results into the reports. The
+    engine is in the 'f5ltm' package.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+def main():
+
+    """ Main Program, '--profile' profiles the run, see 'f5ltm.profiling' """
+
+    from f5ltm.distributed import run
+    from f5ltm.profiling import profile_main
+
+    profile_main(run)
+
+
+if __name__ == "__main__":
+
+    main()
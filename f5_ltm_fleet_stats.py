@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+
+""" Collects F5 LTM Virtual Server details and Pool stats from a fleet of
+    LTMs listed in an inventory file, and writes the active and inactive
+    virtual servers for each to .csv files. The engine is in the 'f5ltm'
+    package.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+def main():
+
+    """ Main Program, '--profile' profiles the run, see 'f5ltm.profiling' """
+
+    from f5ltm.fleet import run
+    from f5ltm.profiling import profile_main
+
+    profile_main(run)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+
+""" Reports the F5 LTM Virtual Server details and Pool stats from a binary
+    snapshot written by a previous run, without contacting the LTM. Only the
+    records for the virtual servers reported on are read from the snapshot.
+    The engine is in the 'f5ltm' package.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+def main():
+
+    """ Main Program, '--profile' profiles the run, see 'f5ltm.profiling' """
+
+    from f5ltm.snapshot import run
+    from f5ltm.profiling import profile_main
+
+    profile_main(run)
+
+
+if __name__ == "__main__":
+
+    main()
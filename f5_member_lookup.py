@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+
+""" Looks up every F5 LTM Virtual Server in front of a backend IP address,
+    address:port or CIDR range, from the index built by previous
+    collections, without contacting any device. The engine is in the
+    'f5ltm' package.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+def main():
+
+    """ Main Program, '--profile' profiles the run, see 'f5ltm.profiling' """
+
+    from f5ltm.member_index import run
+    from f5ltm.profiling import profile_main
+
+    profile_main(run)
+
+
+if __name__ == "__main__":
+
+    main()
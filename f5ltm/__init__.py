@@ -0,0 +1,59 @@
+""" F5 LTM Virtual Server and Pool stats tools.
+
+    The scripts in the top level directory are thin entry points onto this
+    package:
+
+        engine       - create_virt_dict, xref_pools, the writers and menu
+        auth         - basic and token authentication backends
+        client       - shared REST API client
+        dump         - raw API call written to a text file
+        fleet        - HA aware collection from an inventory of LTMs
+        ha           - device group and failover state discovery
+        partitions   - partition sharded parallel collection
+        selection    - targeted fetch of the pools of selected virtuals
+        virt_stats   - clientside stats classifier
+        dormancy     - last seen active index
+        config_cache - config generation aware virtual config cache
+        snapshot     - memory mapped binary stats snapshot
+        reports      - all reports in one pass with compressed output
+        member_index - fleet wide backend member to virtual server index
+        singleflight - coalescing of identical concurrent API calls
+        nodes        - node level stats and the shared node table
+        rollups      - incremental pool, partition and device totals
+        topn         - top and bottom N reports by heap selection
+        live         - live refreshing view of a pool's member stats
+        pool_refs    - cached iRule and policy pool references
+        distributed  - collection across several collector hosts
+        profiling    - '--profile' mode with collapsed stack output
+        columnar     - Arrow and Parquet export of the member stats
+        aioclient    - asyncio client for embedding in async services
+        deltas       - reset and wrap safe counter deltas and rates
+
+    Submodules are imported on first access, e.g. 'f5ltm.engine', so that
+    importing the package stays cheap.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import importlib
+
+
+SUBMODULES = ('engine', 'auth', 'client', 'dump', 'fleet', 'ha', 'partitions',
+              'selection', 'virt_stats', 'dormancy', 'config_cache',
+              'snapshot', 'reports', 'member_index',
+              'singleflight', 'nodes', 'rollups', 'topn', 'live',
+              'pool_refs', 'distributed', 'profiling', 'columnar',
+              'aioclient', 'deltas')
+
+
+def __getattr__(name):
+
+    """ Import submodules on first access """
+
+    if name in SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+
+    raise AttributeError('module {!r} has no attribute {!r}'
+                         .format(__name__, name))
@@ -0,0 +1,306 @@
+""" Asyncio F5 REST API client, for embedding the collection in asyncio
+    services without wrapping the blocking client in executor threads.
+
+    Mirrors the blocking client in 'client': credentials are exchanged for a
+    token, falling back to basic authentication when token login is disabled,
+    an expired token is refreshed once on a 401, and identical calls made at
+    the same time to the same device share one request. All the devices share
+    one pooled aiohttp session, so thousands of device requests can run on
+    one event loop.
+
+    Errors are raised to the caller, as 'aiohttp.ClientError', rather than
+    reported to the user, as the caller is a service not a terminal.
+
+    The results are parsed with the same 'create_virt_dict' and 'xref_pools'
+    as the blocking tools. Needs the 'aiohttp' package, pip install aiohttp.
+
+    This module expects the following API URLs as follows:
+
+        https://<ip-address>/mgmt/shared/authn/login
+        https://<ip-address>/mgmt/tm/ltm/virtual
+        https://<ip-address>/mgmt/tm/ltm/pool/members/stats
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import asyncio
+
+
+# Connections held open by the shared session, in total and per device
+MAX_CONNECTIONS = 512
+MAX_PER_DEVICE = 4
+
+# Seconds before a request times out
+TIMEOUT = 30
+
+# Items per page when paging through a collection
+PAGE_SIZE = 500
+
+# Devices collected at the same time by 'async_collect_fleet'
+MAX_DEVICES = 200
+
+
+def import_aiohttp():
+
+    """ Returns the aiohttp module, or exits if it is not installed """
+
+    try:
+        import aiohttp
+    except ImportError:
+        raise SystemExit('The asyncio client needs the aiohttp package, '
+                         'pip install aiohttp')
+
+    return aiohttp
+
+
+def new_async_session(max_connections=MAX_CONNECTIONS,
+                      max_per_device=MAX_PER_DEVICE, timeout=TIMEOUT):
+
+    """ Returns a pooled aiohttp session for the F5 REST API, shared by all
+        the device clients. Must be created, and closed, in a coroutine.
+    """
+
+    aiohttp = import_aiohttp()
+
+    # Unsigned device certificates are not verified, as the blocking client
+    connector = aiohttp.TCPConnector(limit=max_connections,
+                                     limit_per_host=max_per_device,
+                                     ssl=False)
+
+    return aiohttp.ClientSession(connector=connector,
+                                 headers={'Content-Type': 'application/json'},
+                                 timeout=aiohttp.ClientTimeout(total=timeout))
+
+
+def new_async_client(session, ipaddr, username=None, passwd=None):
+
+    """ Returns a client for the device, not yet logged in """
+
+    client = {'ipaddr': ipaddr,
+              'base_url': 'https://' + ipaddr,
+              'username': username,
+              'passwd': passwd,
+              'session': session,
+              'auth_mode': 'basic',
+              'token': None,
+              'requests': 0,
+              'inflight': {},
+              'login_lock': asyncio.Lock()
+              }
+
+    return client
+
+
+async def async_token_login(client):
+
+    """ Exchanges the client's credentials for an F5 authentication token.
+        Returns the token, or None if token login is disabled on the device.
+    """
+
+    body = {
+        "username": client['username'],
+        "password": client['passwd'],
+        "loginProviderName": "tmos"
+    }
+
+    async with client['session'].post(client['base_url']
+                                      + '/mgmt/shared/authn/login',
+                                      json=body) as response:
+
+        # Token login disabled or not available, fall back to basic auth
+        if response.status in (401, 403, 404):
+            return None
+        response.raise_for_status()
+        login = await response.json()
+
+    return login['token']['token']
+
+
+def set_async_token(client, token):
+
+    """ Sets the token used by the client, or basic authentication if the
+        token is None.
+    """
+
+    client['token'] = token
+    client['auth_mode'] = 'basic' if token is None else 'token'
+
+
+async def async_login(session, username, passwd, ipaddr):
+
+    """ Logs in to the F5 LTM and returns a client. A token is used if the
+        device allows token login, otherwise basic authentication.
+    """
+
+    client = new_async_client(session, ipaddr, username, passwd)
+    set_async_token(client, await async_token_login(client))
+
+    return client
+
+
+def async_token_client(session, ipaddr, token):
+
+    """ Returns a client for a token that has already been retrieved """
+
+    client = new_async_client(session, ipaddr)
+    set_async_token(client, token)
+
+    return client
+
+
+def request_auth(client):
+
+    """ Returns the headers and auth for a request with the client """
+
+    if client['auth_mode'] == 'token':
+        return {'X-F5-Auth-Token': client['token']}, None
+
+    aiohttp = import_aiohttp()
+
+    return {}, aiohttp.BasicAuth(client['username'], client['passwd'])
+
+
+async def refresh_token(client, stale_token):
+
+    """ Logs in again after a 401, unless another request already has """
+
+    async with client['login_lock']:
+        if client['token'] == stale_token:
+            set_async_token(client, await async_token_login(client))
+
+
+async def async_fetch(client, api_url):
+
+    """ Makes the GET request for the API URL with the client and returns the
+        JSON response as a dictionary.
+    """
+
+    for attempt in (1, 2):
+        token = client['token']
+        headers, auth = request_auth(client)
+        async with client['session'].get(api_url, headers=headers,
+                                         auth=auth) as response:
+
+            # Token expired, log in again once if we hold the credentials
+            if (response.status == 401 and attempt == 1
+                    and client['auth_mode'] == 'token'
+                    and client['passwd'] is not None):
+                await refresh_token(client, token)
+                continue
+
+            response.raise_for_status()
+            client['requests'] += 1
+            return await response.json()
+
+
+async def async_get_call(client, uri_ext, module='ltm'):
+
+    """ Makes an F5 GET API call with the client and returns the JSON response
+        as a dictionary. 'module' selects the tmsh module the URI extension
+        sits under, e.g. 'ltm' or 'cm'.
+
+        Identical calls made at the same time with the client share one
+        request and its result, which must not be modified.
+    """
+
+    # Form complete API call URL
+    api_url = '{}/mgmt/tm/{}/{}'.format(client['base_url'], module, uri_ext)
+
+    # Another caller is making this call, wait for its result
+    future = client['inflight'].get(api_url)
+    if future is not None:
+        return await asyncio.shield(future)
+
+    future = asyncio.ensure_future(async_fetch(client, api_url))
+    client['inflight'][api_url] = future
+    try:
+        return await asyncio.shield(future)
+    finally:
+        if client['inflight'].get(api_url) is future:
+            del client['inflight'][api_url]
+
+
+async def async_get_paged(client, uri_ext, module='ltm', page_size=PAGE_SIZE):
+
+    """ Makes an F5 GET API call for a collection one page of 'page_size'
+        items at a time, with '$top' and '$skip', and returns the response
+        with the items of every page.
+    """
+
+    # Intialise variables
+    items = []
+    skip = 0
+    sep = '&' if '?' in uri_ext else '?'
+
+    while True:
+        page = await async_get_call(client, '{}{}$top={}&$skip={}'
+                                    .format(uri_ext, sep, page_size, skip),
+                                    module)
+        page_items = page.get('items', [])
+        items.extend(page_items)
+        skip += len(page_items)
+        if len(page_items) < page_size or 'nextLink' not in page:
+            break
+
+    return {'items': items}
+
+
+def bind_async(client):
+
+    """ Returns the async GET call with the client bound, the asyncio form of
+        'auth.bind_backend', e.g.
+
+            api_get = bind_async(client)
+            ltm_virt = await api_get('virtual')
+    """
+
+    async def api_get(uri_ext, module='ltm'):
+        return await async_get_call(client, uri_ext, module)
+
+    return api_get
+
+
+async def async_collect(client, page_size=PAGE_SIZE):
+
+    """ Fetches the Virtual Server details and LTM Pool stats for the device
+        at the same time, and cross references them. Returns the virtual
+        server dictionary and the active and inactive dictionaries.
+    """
+
+    from .engine import create_virt_dict, xref_pools
+
+    ltm_virt, ltm_stats = await asyncio.gather(
+        async_get_paged(client, 'virtual', page_size=page_size),
+        async_get_call(client, 'pool/members/stats'))
+
+    virt_dict = create_virt_dict(ltm_virt)
+    virt_act_dict, virt_inact_dict = xref_pools(virt_dict, ltm_stats)
+
+    return virt_dict, virt_act_dict, virt_inact_dict
+
+
+async def async_collect_fleet(username, passwd, devices,
+                              max_devices=MAX_DEVICES):
+
+    """ Logs in to and collects every device on one event loop, at most
+        'max_devices' at a time. Returns a dictionary of device to its
+        'async_collect' result, or the exception the device failed with.
+    """
+
+    # Intialise variables
+    semaphore = asyncio.Semaphore(max_devices)
+
+    async with new_async_session() as session:
+
+        async def collect_device(ipaddr):
+            async with semaphore:
+                client = await async_login(session, username, passwd, ipaddr)
+                return await async_collect(client)
+
+        results = await asyncio.gather(*[collect_device(ipaddr)
+                                         for ipaddr in devices],
+                                       return_exceptions=True)
+
+    return dict(zip(devices, results))
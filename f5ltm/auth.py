@@ -0,0 +1,99 @@
+""" Authentication backends for the F5 REST API calls.
+
+    Both backends make their calls through the shared client:
+
+        basic - takes the username and password, exchanges them for a token
+                on the first call to each device and only uses basic
+                authentication if token login is disabled on the device.
+        token - takes a token that has already been retrieved.
+
+    'bind_backend' returns the GET call with the device credentials already
+    bound, as expected by the rest of the package, e.g.
+
+        api_get = bind_backend('token', username, passwd, ipaddr)
+        ltm_virt = api_get('virtual')
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+from functools import partial
+from .client import (get_client, token_client, client_get_call, new_session,
+                     token_login, auth_report)
+
+
+# Clients already created, keyed by IP address and token
+_token_clients = {}
+
+BACKENDS = ('basic', 'token')
+
+
+def get_token(username, passwd, ipaddr):
+
+    """ Get F5 authentication token """
+
+    token = token_login(new_session(), username, passwd, ipaddr)
+
+    return token
+
+
+def basic_get_call(username, passwd, ipaddr, uri_ext, module='ltm'):
+
+    """ Makes an F5 GET API call using the username and password and returns
+        the JSON response as a dictionary. 'module' selects the tmsh module
+        the URI extension sits under, e.g. 'ltm' or 'cm'.
+
+        The credentials are exchanged for a token on the first call to each
+        device, and basic authentication is only used if token login is
+        disabled on the device.
+    """
+
+    client = get_client(username, passwd, ipaddr)
+
+    return client_get_call(client, uri_ext, module)
+
+
+def token_get_call(ipaddr, token, uri_ext, module='ltm'):
+
+    """ Makes an F5 GET API call using an authentication token and returns
+        the JSON response as a dictionary. 'module' selects the tmsh module
+        the URI extension sits under, e.g. 'ltm' or 'cm'.
+    """
+
+    # Reuse one client, and so one session, per device and token
+    key = (ipaddr, token)
+    if key not in _token_clients:
+        _token_clients[key] = token_client(ipaddr, token)
+
+    return client_get_call(_token_clients[key], uri_ext, module)
+
+
+def bind_backend(backend, username, passwd, ipaddr):
+
+    """ Logs in with the named backend and returns the GET call with the
+        device credentials bound. Exits if the token backend is asked for and
+        token login is disabled on the device.
+    """
+
+    if backend == 'token':
+        token = get_token(username, passwd, ipaddr)
+        if token is None:
+            raise SystemExit('Token login is disabled on {}, use the basic '
+                             'backend which falls back to basic '
+                             'authentication'.format(ipaddr))
+        return partial(token_get_call, ipaddr, token)
+
+    return partial(basic_get_call, username, passwd, ipaddr)
+
+
+def backend_report(backend, username, ipaddr):
+
+    """ Returns a line reporting the authentication overhead saved, for the
+        basic backend, otherwise an empty string.
+    """
+
+    if backend != 'basic':
+        return ''
+
+    return auth_report(get_client(username, None, ipaddr))
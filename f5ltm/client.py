@@ -0,0 +1,332 @@
+""" Shared F5 REST API client used by both the basic authentication and the
+    token authentication tools.
+
+    With remote authentication (LDAP/TACACS) the BIG-IP runs a full
+    authentication round trip for every basic authentication request. The
+    client therefore exchanges the credentials for a token once, and only
+    falls back to basic authentication when token login is disabled. One
+    requests session is kept per device so connections are reused.
+
+    The client is a dictionary holding the device, session and counters. The
+    per request authentication overhead saved by using a token can be
+    reported at the end of a run when the script is run with
+    '--measure-auth'. Measuring it costs one more basic authentication
+    request, a full remote authentication round trip, per device.
+
+    This module expects the following API URLs as follows:
+
+        https://<ip-address>/mgmt/shared/authn/login
+        https://<ip-address>/mgmt/tm/sys/version
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+
+
+# Clients already logged in, keyed by IP address and username
+_clients = {}
+_clients_lock = threading.Lock()
+
+# Per thread flag, set within 'raise_request_errors'
+_error_mode = threading.local()
+
+
+def new_session():
+
+    """ Returns a requests session set up for the F5 REST API """
+
+    # Imported on first use, as it is slow to import
+    import requests
+    from urllib3.exceptions import InsecureRequestWarning
+
+    # Disable warning from using unsigned certificate
+    requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+
+    session = requests.session()
+    session.verify = False
+    session.headers.update({'Content-Type':'application/json'})
+
+    return session
+
+
+def token_login(session, username, passwd, ipaddr):
+
+    """ Exchanges the credentials for an F5 authentication token. Returns the
+        token, or None if token login is disabled on the device.
+    """
+
+    body = {
+        "username": username,
+        "password": passwd,
+        "loginProviderName": "tmos"
+    }
+
+    response = session.post(f'https://{ipaddr}/mgmt/shared/authn/login',
+                            json=body, timeout=5)
+
+    # Token login disabled or not available, fall back to basic auth
+    if response.status_code in (401, 403, 404):
+        return None
+    response.raise_for_status()
+
+    return response.json()['token']['token']
+
+
+def time_request(session, api_url, auth=None, headers=None):
+
+    """ Returns the time taken in seconds to make a GET request """
+
+    start = time.perf_counter()
+    session.get(api_url, auth=auth, headers=headers,
+                timeout=5).raise_for_status()
+
+    return time.perf_counter() - start
+
+
+def measure_auth_overhead(client, username, passwd):
+
+    """ Measures the per request authentication overhead by timing the same
+        cheap request with basic authentication and with the token.
+    """
+
+    import requests
+
+    api_url = 'https://{}/mgmt/tm/sys/version'.format(client['ipaddr'])
+    session = client['session']
+
+    # The token header is removed so the first request is basic only
+    try:
+        basic_time = time_request(session, api_url, auth=(username, passwd),
+                                  headers={'X-F5-Auth-Token': None})
+        token_time = time_request(session, api_url)
+    except requests.exceptions.RequestException:
+        return 0.0
+
+    return max(basic_time - token_time, 0.0)
+
+
+def f5_login(username, passwd, ipaddr, measure=None):
+
+    """ Logs in to the F5 LTM and returns a client. A token is used if the
+        device allows token login, otherwise basic authentication. The
+        authentication overhead is only measured if 'measure' is True, or
+        if it is None and the script was run with '--measure-auth'.
+    """
+
+    import requests
+
+    if measure is None:
+        measure = '--measure-auth' in sys.argv[1:]
+
+    session = new_session()
+
+    client = {'ipaddr': ipaddr,
+              'username': username,
+              'passwd': passwd,
+              'session': session,
+              'auth_mode': 'basic',
+              'token': None,
+              'requests': 0,
+              'login_time': 0.0,
+              'auth_overhead': 0.0,
+              'lock': threading.Lock()
+              }
+
+    start = time.perf_counter()
+    try:
+        token = token_login(session, username, passwd, ipaddr)
+    except requests.exceptions.RequestException as err_re:
+        handle_request_error(err_re, ipaddr)
+    client['login_time'] = time.perf_counter() - start
+
+    if token:
+        set_token(client, token)
+        if measure:
+            client['auth_overhead'] = measure_auth_overhead(client, username,
+                                                            passwd)
+    else:
+        set_basic(client)
+
+    return client
+
+
+def token_client(ipaddr, token):
+
+    """ Returns a client for a token that has already been retrieved """
+
+    client = {'ipaddr': ipaddr,
+              'username': None,
+              'passwd': None,
+              'session': new_session(),
+              'auth_mode': 'token',
+              'token': None,
+              'requests': 0,
+              'login_time': 0.0,
+              'auth_overhead': 0.0,
+              'lock': threading.Lock()
+              }
+    set_token(client, token)
+
+    return client
+
+
+def set_token(client, token):
+
+    """ Sets the token used by the client """
+
+    client['auth_mode'] = 'token'
+    client['token'] = token
+    client['session'].headers.update({'X-F5-Auth-Token': token})
+
+
+def set_basic(client):
+
+    """ Sets the client to use basic authentication with its credentials """
+
+    client['auth_mode'] = 'basic'
+    client['token'] = None
+    client['session'].headers.pop('X-F5-Auth-Token', None)
+    client['session'].auth = (client['username'], client['passwd'])
+
+
+def get_client(username, passwd, ipaddr):
+
+    """ Returns the logged in client for the device, logging in only on the
+        first call.
+    """
+
+    key = (ipaddr, username)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = f5_login(username, passwd, ipaddr)
+
+    return _clients[key]
+
+
+def client_get_call(client, uri_ext, module='ltm'):
+
+    """ Makes an F5 GET API call with the client and returns the JSON response
+        as a dictionary. 'module' selects the tmsh module the URI extension
+        sits under, e.g. 'ltm' or 'cm'.
+
+        Identical calls made at the same time to the same device share one
+        API call and its result, see 'singleflight'.
+    """
+
+    from .singleflight import flight_key, single_flight
+
+    # Form complete API call URL
+    api_url = 'https://{}/mgmt/tm/{}/{}'.format(client['ipaddr'], module,
+                                                uri_ext)
+
+    key = flight_key(client['ipaddr'], module, uri_ext)
+
+    return single_flight(key, lambda: fetch_api_url(client, api_url))
+
+
+def fetch_api_url(client, api_url):
+
+    """ Makes the GET request for the API URL with the client and returns the
+        JSON response as a dictionary.
+    """
+
+    import requests
+
+    # Make REST API call and perform error handling
+    try:
+        myapi = client['session'].get(api_url, timeout=5)
+
+        # Token expired, log in again once if we hold the credentials
+        if (myapi.status_code == 401 and client['auth_mode'] == 'token'
+                and client['passwd'] is not None):
+            token = token_login(client['session'], client['username'],
+                                client['passwd'], client['ipaddr'])
+
+            # Token login since disabled, fall back to basic auth
+            if token:
+                set_token(client, token)
+            else:
+                set_basic(client)
+            myapi = client['session'].get(api_url, timeout=5)
+
+        myapi.raise_for_status()
+    except requests.exceptions.RequestException as err_re:
+        handle_request_error(err_re, api_url)
+
+    with client['lock']:
+        client['requests'] += 1
+
+    return myapi.json()
+
+
+@contextmanager
+def raise_request_errors():
+
+    """ Within the block, a failed API call made by this thread raises its
+        requests exception to the caller rather than being reported to the
+        user before exiting, for callers that carry on after a failure.
+    """
+
+    previous = getattr(_error_mode, 'raise_errors', False)
+    _error_mode.raise_errors = True
+    try:
+        yield
+    finally:
+        _error_mode.raise_errors = previous
+
+
+def handle_request_error(err, api_url):
+
+    """ Reports a failed API call to the user and exits, or raises it to the
+        caller within 'raise_request_errors'.
+    """
+
+    import requests
+
+    if getattr(_error_mode, 'raise_errors', False):
+        raise err
+
+    os.system('cls')
+    if isinstance(err, requests.exceptions.HTTPError):
+        print('\nHTTP Error: {}'.format(err))
+    elif isinstance(err, requests.exceptions.ConnectionError):
+        print ('\nError Connecting: {}'.format(err))
+        print('\nIs the F5 LTM IP address correct, or reachable?')
+    elif isinstance(err, requests.exceptions.Timeout):
+        print('\nTimeout Error: {}'.format(err))
+        print('\nIs the F5 LTM IP address you entered correct, or is there '
+              'a problem with the LTM API configuration for your account?')
+    elif isinstance(err, requests.exceptions.TooManyRedirects):
+        print('\nToo many redirects: {}'.format(err))
+    else:
+        print('\nSerious unknown error encountered calling {}, exiting '
+              'program, please rerun and try again.'.format(api_url))
+    input('\nPress Enter to Exit')
+    raise SystemExit(err)
+
+
+def auth_report(client):
+
+    """ Returns a line reporting the authentication mode used and the per
+        request authentication overhead saved by the token.
+    """
+
+    if client['auth_mode'] != 'token' or not client['auth_overhead']:
+        return ('{}: {} authentication, {} requests'
+                .format(client['ipaddr'], client['auth_mode'],
+                        client['requests']))
+
+    saved = (client['auth_overhead'] * client['requests']
+             - client['login_time'])
+
+    return ('{}: token authentication, {} requests, {:.0f} ms auth overhead '
+            'per basic request, {:.2f} s saved'
+            .format(client['ipaddr'], client['requests'],
+                    client['auth_overhead'] * 1000, saved))
@@ -0,0 +1,178 @@
+""" Columnar export of the pool member stats, to Apache Arrow IPC or Parquet,
+    for loading straight into pandas or other analytics tools without
+    parsing text.
+
+    One row is written per pool member per virtual server, like the pool
+    member stats .csv. The counters are int64, the device, partition, pool
+    and virtual server columns are dictionary encoded, and every row carries
+    the time the stats were collected. Rows are written in record batches of
+    'BATCH_ROWS' as the virtual servers are streamed, so the whole export is
+    never held in memory.
+
+    Needs the 'pyarrow' package, pip install pyarrow. Arrow is written in
+    the IPC stream format, read it with 'pyarrow.ipc.open_stream'.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+from .engine import STAT_NAMES, virt_pools
+
+
+# Rows per record batch
+BATCH_ROWS = 65536
+
+# File extension for each format
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrows'}
+
+# Dictionary encoded columns, in column order
+LABELS = ['device', 'partition', 'pool', 'virtual']
+
+
+def import_pyarrow():
+
+    """ Returns the pyarrow module, or exits if it is not installed """
+
+    try:
+        import pyarrow
+    except ImportError:
+        raise SystemExit('Columnar export needs the pyarrow package, '
+                         'pip install pyarrow')
+
+    return pyarrow
+
+
+def member_schema(pa):
+
+    """ Returns the Arrow schema of the member records """
+
+    label_type = pa.dictionary(pa.int32(), pa.string())
+
+    return pa.schema([(label, label_type) for label in LABELS]
+                     + [('member', pa.string()),
+                        ('collected', pa.timestamp('s', tz='UTC'))]
+                     + [(counter, pa.int64()) for counter in STAT_NAMES])
+
+
+def iter_member_rows(virt_dict, device):
+
+    """ Yields each pool member of each virtual server in the passed
+        dictionary (as returned by 'xref_pools') as a tuple of the label
+        columns, the member id and its stats.
+    """
+
+    for virt, values in virt_dict.items():
+        dest = values['virt_dest'].split('/')
+        partition = dest[1] if len(dest) > 2 else ''
+        for pool_name, pool_mems in virt_pools(values):
+            for mem in pool_mems:
+                for mem_id, stats in mem.items():
+                    if mem_id:
+                        yield ((device, partition, pool_name, virt), mem_id,
+                               stats)
+
+
+def open_writer(pa, filename, file_format, schema):
+
+    """ Opens a record batch writer for the format """
+
+    if file_format == 'parquet':
+        import pyarrow.parquet
+        return pyarrow.parquet.ParquetWriter(filename, schema)
+
+    return pa.ipc.new_stream(filename, schema)
+
+
+def make_batch(pa, schema, columns, collected):
+
+    """ Returns a record batch of the buffered columns """
+
+    arrays = [pa.array(columns[label], pa.string()).dictionary_encode()
+              for label in LABELS]
+    arrays.append(pa.array(columns['member'], pa.string()))
+    arrays.append(pa.array([collected] * len(columns['member']),
+                           pa.timestamp('s', tz='UTC')))
+    arrays += [pa.array(columns[counter], pa.int64())
+               for counter in STAT_NAMES]
+
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_columnar(virt_dict, filename, device, collected,
+                   file_format='parquet', batch_rows=BATCH_ROWS):
+
+    """ Writes the pool member stats of the passed dictionary to an Arrow or
+        Parquet file, in record batches of 'batch_rows'. 'collected' is the
+        time the stats were collected, as a POSIX timestamp. The file is
+        written to a temporary name and renamed into place. Returns the
+        number of rows written.
+    """
+
+    pa = import_pyarrow()
+    schema = member_schema(pa)
+
+    # Intialise variables
+    columns = {column: [] for column in LABELS + ['member'] + STAT_NAMES}
+    rows = 0
+    collected = int(collected)
+
+    tmp_filename = filename + '.tmp'
+    writer = open_writer(pa, tmp_filename, file_format, schema)
+    try:
+        for labels, mem_id, stats in iter_member_rows(virt_dict, device):
+            for label, value in zip(LABELS, labels):
+                columns[label].append(value)
+            columns['member'].append(mem_id)
+            for counter in STAT_NAMES:
+                columns[counter].append(stats.get(counter, 0))
+            rows += 1
+
+            # Flush a full batch
+            if len(columns['member']) >= batch_rows:
+                writer.write_batch(make_batch(pa, schema, columns, collected))
+                for values in columns.values():
+                    values.clear()
+
+        if columns['member'] or rows == 0:
+            writer.write_batch(make_batch(pa, schema, columns, collected))
+    except BaseException:
+        writer.close()
+        os.remove(tmp_filename)
+        raise
+
+    writer.close()
+    os.replace(tmp_filename, filename)
+
+    return rows
+
+
+def write_columnar_menu(virt_dict, device, collected):
+
+    """ Ask the user for the filename and format, then write the pool member
+        stats to an Arrow or Parquet file.
+    """
+
+    from .engine import get_filename
+
+    import_pyarrow()
+
+    message = ('\n\nPlease enter the name of the file you wish to save '
+               'without the file extension,\nmembers will be '
+               'suffixed to the filename along with the date and time: ')
+    filename, dt_str = get_filename(message)
+
+    file_format = input('\nFormat? (enter for parquet, or arrow): ').lower()
+    while file_format not in FORMATS and file_format != '':
+        file_format = input('Please enter parquet, arrow or press enter for '
+                            'parquet: ').lower()
+    file_format = file_format or 'parquet'
+    os.system('cls')
+
+    filename = filename + '_members_' + dt_str + FORMATS[file_format]
+    rows = write_columnar(virt_dict, filename, device, collected, file_format)
+
+    print('\n{} pool member rows have been written to timestamped {} in the '
+          'local directory'.format(rows, filename))
+    input('\nPress enter to return to options menu.')
@@ -0,0 +1,175 @@
+""" Caches the F5 LTM Virtual Server config between runs. The config changes
+    far less often than the pool stats, so the 'virtual' response is reused
+    while the BIG-IP config generation is unchanged and only the volatile
+    stats are re-polled.
+
+    The config generation is taken from the time of the last local config
+    change, which is a single cheap API call:
+
+        https://<ip-address>/mgmt/tm/sys/db/configsync.localconfigtime
+
+    The 'virtual' call is made with its subcollections expanded, so the LTM
+    policies attached to each virtual server come in the same response, and
+    are kept as a 'policies' list of their full paths.
+
+    Only the fields 'create_virt_dict' and the selectors need are kept, both
+    in memory (for repeated calls within one run) and in a JSON file per
+    device (for later runs). Filtered calls, such as the per partition
+    'virtual?$filter=partition eq X' calls, are cached separately by their
+    URI extension.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+import json
+import threading
+
+
+# Directory the cached config is written to
+CACHE_DIR = 'f5_config_cache'
+
+# Virtual server fields kept in the cache, 'policies' is built by
+# 'slim_virtual' from the expanded 'policiesReference'
+VIRT_FIELDS = ['name', 'fullPath', 'partition', 'destination', 'pool',
+               'description', 'rules', 'policies']
+
+# Cached config held in memory, keyed by device
+_memory_cache = {}
+
+# Serialises cache updates from the parallel partition collection
+_cache_lock = threading.Lock()
+
+
+def get_config_generation(api_get):
+
+    """ Returns the config generation of the LTM """
+
+    generation = api_get('db/configsync.localconfigtime', module='sys')
+
+    return generation['value']
+
+
+def expanded_uri(uri_ext):
+
+    """ Returns the URI extension of a 'virtual' call with its subcollections
+        expanded.
+    """
+
+    sep = '&' if '?' in uri_ext else '?'
+
+    return uri_ext + sep + 'expandSubcollections=true'
+
+
+def slim_virtual(ltm_virt):
+
+    """ Returns the expanded 'virtual' response with only the fields we need,
+        and each virtual server's policies as a list of their full paths.
+    """
+
+    # Intialise variables
+    items = []
+
+    for virt in ltm_virt.get('items', []):
+        slim = {field: virt[field] for field in VIRT_FIELDS if field in virt}
+        slim['policies'] = [policy['fullPath'] for policy in
+                            virt.get('policiesReference', {}).get('items', [])]
+        items.append(slim)
+
+    return {'items': items}
+
+
+def cache_filename(device, cache_dir=CACHE_DIR):
+
+    """ Returns the name of the cache file for the device """
+
+    return os.path.join(cache_dir, device.replace(':', '_') + '.json')
+
+
+def is_virtual_call(uri_ext):
+
+    """ Returns True if the URI extension is a 'virtual' collection call,
+        filtered or not.
+    """
+
+    return uri_ext == 'virtual' or uri_ext.startswith('virtual?')
+
+
+def load_config(device, generation, uri_ext='virtual', cache_dir=CACHE_DIR):
+
+    """ Returns the cached response of the 'virtual' call for the device if it
+        was cached at the passed config generation, otherwise None.
+    """
+
+    cached = _memory_cache.get(device)
+
+    if cached is None:
+        try:
+            with open(cache_filename(device, cache_dir)) as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return None
+        _memory_cache[device] = cached
+
+    if (cached.get('generation') != generation
+            or cached.get('fields') != VIRT_FIELDS):
+        return None
+
+    return cached.get('responses', {}).get(uri_ext)
+
+
+def save_config(device, generation, ltm_virt, uri_ext='virtual',
+                cache_dir=CACHE_DIR):
+
+    """ Caches the response of the 'virtual' call for the device at the
+        passed config generation, dropping responses cached at an older one.
+    """
+
+    with _cache_lock:
+        cached = _memory_cache.get(device)
+        if (cached is None or cached.get('generation') != generation
+                or cached.get('fields') != VIRT_FIELDS):
+            cached = {'generation': generation, 'fields': VIRT_FIELDS,
+                      'responses': {}}
+        cached.setdefault('responses', {})[uri_ext] = ltm_virt
+        _memory_cache[device] = cached
+
+        os.makedirs(cache_dir, exist_ok=True)
+        filename = cache_filename(device, cache_dir)
+        with open(filename + '.tmp', 'w') as file:
+            json.dump(cached, file)
+        os.replace(filename + '.tmp', filename)
+
+
+def get_virtual_config(api_get, device, uri_ext='virtual',
+                       cache_dir=CACHE_DIR):
+
+    """ Returns the response of the 'virtual' call for the device, from the
+        cache if the config generation is unchanged, otherwise from the API.
+    """
+
+    generation = get_config_generation(api_get)
+
+    ltm_virt = load_config(device, generation, uri_ext, cache_dir)
+    if ltm_virt is None:
+        ltm_virt = slim_virtual(api_get(expanded_uri(uri_ext)))
+        save_config(device, generation, ltm_virt, uri_ext, cache_dir)
+
+    return ltm_virt
+
+
+def cache_virtual_config(api_get, device, cache_dir=CACHE_DIR):
+
+    """ Wraps the passed GET call so 'virtual', and its filtered calls, are
+        served from the config cache, all other API calls are passed straight
+        through.
+    """
+
+    def cached_get(uri_ext, module='ltm'):
+        if module == 'ltm' and is_virtual_call(uri_ext):
+            return get_virtual_config(api_get, device, uri_ext, cache_dir)
+        return api_get(uri_ext, module=module)
+
+    return cached_get
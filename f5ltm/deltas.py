@@ -0,0 +1,142 @@
+""" Delta engine turning repeated pool member stats pulls into per second
+    rates, safe against counter resets and wraps.
+
+    The previous counters of every member are held in one flat array of
+    unsigned 64 bit values, 'len(STAT_NAMES)' per member, at an index
+    interned from the member's key (pool name and member id). Each pull is
+    packed into a flat array the same way and the deltas of every member and
+    counter are taken in one step over the two arrays.
+
+    A counter that goes backwards has either wrapped, when it was near the
+    top of the 64 bit range of the iControl counters and is now near the
+    bottom, or been reset by a failover, 'tmsh reset-stats' or the member
+    being re-added. A reset clears all of a member's counters together, so
+    the member's delta is then its counters since the reset.
+
+    'serverside_curconns' and 'serverside_maxconns' (a high water mark) are
+    gauges, not counters, so their current values are reported in place of
+    rates.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+from array import array
+from .engine import STAT_NAMES
+
+
+WIDTH = len(STAT_NAMES)
+
+# Stats that are gauges rather than counters, by position
+GAUGES = {STAT_NAMES.index('serverside_curconns'),
+          STAT_NAMES.index('serverside_maxconns')}
+
+# Counter sizes a counter may wrap at, the iControl counters are 64 bit
+WRAP_SIZES = [2 ** 64]
+
+
+def new_delta_store():
+
+    """ Returns an empty delta store """
+
+    store = {'ids': {},
+             'values': array('Q'),
+             'times': array('d')
+             }
+
+    return store
+
+
+def intern_key(store, key):
+
+    """ Returns the index of the member key, adding it if it is new """
+
+    index = store['ids'].get(key)
+    if index is None:
+        index = len(store['ids'])
+        store['ids'][key] = index
+        store['values'].extend([0] * WIDTH)
+        store['times'].append(0.0)
+
+    return index
+
+
+def wrapped_delta(prev, cur):
+
+    """ Returns the delta of a counter which has gone from 'prev' to 'cur' by
+        wrapping, or None if it did not wrap (it was reset).
+    """
+
+    for size in WRAP_SIZES:
+        if size * 3 // 4 <= prev < size and cur < size // 4:
+            return cur + size - prev
+
+    return None
+
+
+def update_deltas(store, records, now):
+
+    """ Takes an iterable of (key, stats) for the members of one pull made at
+        POSIX time 'now', and returns a dictionary of key to a dictionary of
+        'rates' (stat to per second rate, None on the first pull of the
+        member), 'reset' and 'wrapped'. The store is updated with the pull.
+    """
+
+    # Intialise variables
+    indexes = []
+    keys = []
+    cur = array('Q')
+    prev = array('Q')
+    results = {}
+
+    # Pack the pull and the previous counters into flat arrays
+    for key, stats in records:
+        index = intern_key(store, key)
+        indexes.append(index)
+        keys.append(key)
+        cur.extend([stats.get(stat, 0) for stat in STAT_NAMES])
+        prev.extend(store['values'][index * WIDTH:(index + 1) * WIDTH])
+
+    # Deltas of every member and counter in one step
+    deltas = [c - p for c, p in zip(cur, prev)]
+
+    for row, (key, index) in enumerate(zip(keys, indexes)):
+        start = row * WIDTH
+        last_time = store['times'][index]
+        seconds = now - last_time
+        member_deltas = deltas[start:start + WIDTH]
+        reset = wrapped = False
+
+        # A counter gone backwards has wrapped or been reset
+        for col, delta in enumerate(member_deltas):
+            if delta >= 0 or col in GAUGES:
+                continue
+            wrap = wrapped_delta(prev[start + col], cur[start + col])
+            if wrap is None:
+                reset = True
+                break
+            member_deltas[col] = wrap
+            wrapped = True
+
+        if reset:
+            member_deltas = list(cur[start:start + WIDTH])
+            wrapped = False
+
+        if last_time == 0.0 or seconds <= 0:
+            rates = dict.fromkeys(STAT_NAMES)
+        else:
+            rates = {stat: delta / seconds
+                     for stat, delta in zip(STAT_NAMES, member_deltas)}
+        for col in GAUGES:
+            rates[STAT_NAMES[col]] = cur[start + col]
+
+        results[key] = {'rates': rates, 'reset': reset, 'wrapped': wrapped}
+
+        # Keep this pull as the previous counters
+        store['values'][index * WIDTH:(index + 1) * WIDTH] = \
+            cur[start:start + WIDTH]
+        store['times'][index] = now
+
+    return results
+
@@ -0,0 +1,380 @@
+""" Distributed collection of a fleet of LTMs across several collector
+    processes or hosts.
+
+    A coordinator queues one collection task per device in the inventory.
+    Workers lease tasks from the queue, run the collection and cross
+    reference for the device, and write the result to a partial result file.
+    A merge step then combines the partial results into the dormancy and
+    member indexes and the reports.
+
+    The queue is an SQLite database. Leases are taken in an immediate
+    transaction, so only one worker can lease a task, and expire after
+    'LEASE_SECONDS' so the task of a worker that dies is leased again. A task
+    that fails, or whose lease expires, is re-queued until it has been tried
+    'MAX_ATTEMPTS' times.
+
+    Workers run unattended, so a failed API call fails the device's task
+    rather than prompting the user.
+
+    The queue and results directory must be on storage all the workers can
+    reach, e.g. a shared filesystem with working file locks, or the local
+    disk when the workers are processes on one host.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+import json
+import time
+import socket
+import sqlite3
+
+
+# Default location of the queue and partial results, in the local directory
+QUEUE_FILE = 'f5_collect_queue.db'
+RESULTS_DIR = 'f5_collect_results'
+
+# Seconds a lease is held before the task can be leased again
+LEASE_SECONDS = 600
+
+# Attempts at a task before it is marked as failed
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        device TEXT PRIMARY KEY, state TEXT, worker TEXT,
+        lease_expires REAL, attempts INTEGER, error TEXT);
+    CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_expires);
+"""
+
+# Collection options used by the workers, the whole of each device
+COLLECT_OPTIONS = {'partition': '',
+                   'pattern': '',
+                   'vs_mode': 'n',
+                   'by_partition': False,
+                   'nodes': False
+                   }
+
+
+def open_queue(queue_file=QUEUE_FILE):
+
+    """ Opens the queue, creating it if it does not exist """
+
+    conn = sqlite3.connect(queue_file, timeout=30, isolation_level=None)
+    conn.executescript(SCHEMA)
+
+    return conn
+
+
+def worker_name():
+
+    """ Returns a name for this worker, unique across hosts """
+
+    return socket.gethostname() + ':' + str(os.getpid())
+
+
+def queue_devices(devices, queue_file=QUEUE_FILE):
+
+    """ Replaces the tasks in the queue with one queued task per device """
+
+    conn = open_queue(queue_file)
+    conn.execute('BEGIN IMMEDIATE')
+    conn.execute('DELETE FROM tasks')
+    conn.executemany("INSERT INTO tasks VALUES (?, 'queued', NULL, NULL, 0, "
+                     "NULL)", [(device,) for device in devices])
+    conn.execute('COMMIT')
+    conn.close()
+
+
+def lease_task(conn, worker, now=None, lease_seconds=LEASE_SECONDS,
+               max_attempts=MAX_ATTEMPTS):
+
+    """ Leases the next queued task, or a task whose lease has expired, to
+        the worker. Returns the device, or None if there is no work left.
+        An expired task that has been tried 'max_attempts' times is marked
+        as failed instead.
+    """
+
+    now = time.time() if now is None else now
+
+    conn.execute('BEGIN IMMEDIATE')
+    conn.execute("UPDATE tasks SET state = 'failed', error = 'Lease expired' "
+                 "WHERE state = 'leased' AND lease_expires < ? AND "
+                 "attempts >= ?", (now, max_attempts))
+    row = conn.execute("SELECT device FROM tasks WHERE state = 'queued' OR "
+                       "(state = 'leased' AND lease_expires < ?) "
+                       "ORDER BY attempts, device LIMIT 1", (now,)).fetchone()
+    if row is None:
+        conn.execute('COMMIT')
+        return None
+
+    conn.execute("UPDATE tasks SET state = 'leased', worker = ?, "
+                 "lease_expires = ?, attempts = attempts + 1 "
+                 "WHERE device = ?", (worker, now + lease_seconds, row[0]))
+    conn.execute('COMMIT')
+
+    return row[0]
+
+
+def complete_task(conn, device, worker):
+
+    """ Marks the worker's leased task as done. Returns False if the lease
+        had been lost to another worker.
+    """
+
+    cursor = conn.execute("UPDATE tasks SET state = 'done', error = NULL "
+                          "WHERE device = ? AND worker = ? AND "
+                          "state = 'leased'", (device, worker))
+
+    return cursor.rowcount == 1
+
+
+def fail_task(conn, device, worker, error, max_attempts=MAX_ATTEMPTS):
+
+    """ Re-queues the worker's leased task after a failure, or marks it as
+        failed once it has been tried 'max_attempts' times.
+    """
+
+    conn.execute("UPDATE tasks SET state = CASE WHEN attempts < ? "
+                 "THEN 'queued' ELSE 'failed' END, error = ? "
+                 "WHERE device = ? AND worker = ? AND state = 'leased'",
+                 (max_attempts, error, device, worker))
+
+
+def queue_status(queue_file=QUEUE_FILE):
+
+    """ Returns a dictionary of task state to the number of tasks """
+
+    conn = open_queue(queue_file)
+    status = dict(conn.execute('SELECT state, COUNT(*) FROM tasks '
+                               'GROUP BY state').fetchall())
+    conn.close()
+
+    return status
+
+
+def result_filename(device, results_dir=RESULTS_DIR):
+
+    """ Returns the name of the partial result file for the device """
+
+    return os.path.join(results_dir, device.replace(':', '_') + '.json')
+
+
+def write_result(device, virt_act_dict, virt_inact_dict,
+                 results_dir=RESULTS_DIR):
+
+    """ Writes a device's active and inactive virtual server dictionaries to
+        its partial result file. The file is written to a temporary name and
+        renamed into place.
+    """
+
+    filename = result_filename(device, results_dir)
+    os.makedirs(results_dir, exist_ok=True)
+
+    tmp_filename = filename + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp_filename, 'w') as file:
+        json.dump({'device': device,
+                   'virt_act_dict': virt_act_dict,
+                   'virt_inact_dict': virt_inact_dict}, file)
+    os.replace(tmp_filename, filename)
+
+
+def read_result(device, results_dir=RESULTS_DIR):
+
+    """ Returns a device's active and inactive virtual server dictionaries
+        from its partial result file.
+    """
+
+    with open(result_filename(device, results_dir)) as file:
+        result = json.load(file)
+
+    return result['virt_act_dict'], result['virt_inact_dict']
+
+
+def collect_device(api_get):
+
+    """ Collects and cross references one device, returning the active and
+        inactive virtual server dictionaries.
+    """
+
+    from .engine import collect
+
+    virt_dict, virt_act_dict, virt_inact_dict, node_table = collect(
+        api_get, COLLECT_OPTIONS)
+
+    return virt_act_dict, virt_inact_dict
+
+
+def run_worker(make_api_get, queue_file=QUEUE_FILE, results_dir=RESULTS_DIR,
+               worker=None):
+
+    """ Leases and collects devices until the queue has no work left.
+        'make_api_get(device)' returns the bound GET call for a device.
+        Returns the number of devices collected.
+    """
+
+    from .client import raise_request_errors
+
+    # Intialise variables
+    worker = worker_name() if worker is None else worker
+    collected = 0
+
+    conn = open_queue(queue_file)
+    device = lease_task(conn, worker)
+    while device is not None:
+        print('Collecting', device)
+        try:
+            # Raise failed API calls to fail the task, rather than prompting
+            with raise_request_errors():
+                virt_act_dict, virt_inact_dict = collect_device(
+                    make_api_get(device))
+            write_result(device, virt_act_dict, virt_inact_dict, results_dir)
+        except (Exception, SystemExit) as err:
+            print('Collection of', device, 'failed:', err)
+            fail_task(conn, device, worker, str(err))
+        else:
+            if complete_task(conn, device, worker):
+                collected += 1
+            else:
+                print('Lease on', device, 'expired, another worker is '
+                      'collecting it')
+        device = lease_task(conn, worker)
+    conn.close()
+
+    return collected
+
+
+def merge_results(filename, dt_str, compression='', queue_file=QUEUE_FILE,
+                  results_dir=RESULTS_DIR):
+
+    """ Combines the partial results of the completed devices into the
+        dormancy and member indexes and writes each device's reports.
+        Returns a dictionary of the devices not completed to their state and
+        last error.
+    """
+
+    from .dormancy import update_index
+    from .member_index import update_member_index
+    from .reports import write_all_reports
+
+    conn = open_queue(queue_file)
+    tasks = conn.execute('SELECT device, state, error FROM tasks '
+                         'ORDER BY device').fetchall()
+    conn.close()
+
+    # Intialise variables
+    incomplete = {}
+
+    for device, state, error in tasks:
+        if state != 'done':
+            incomplete[device] = (state, error)
+            continue
+
+        virt_act_dict, virt_inact_dict = read_result(device, results_dir)
+        virt_dict = {**virt_act_dict, **virt_inact_dict}
+
+        update_index(device, virt_dict)
+        update_member_index(device, virt_dict)
+
+        device_name = device.replace(':', '_')
+        filenames = write_all_reports(virt_dict, virt_act_dict,
+                                      filename + '_' + device_name, dt_str,
+                                      compression)
+        for device_file in filenames.values():
+            print('The file has been written to', device_file)
+
+    return incomplete
+
+
+def distributed_menu():
+    # Setup Distributed Menu
+
+    os.system('cls')
+    print(
+        """
+        Distributed Collection
+        ----------------------
+
+        Q - Quit.
+        1 - Coordinator, queue the devices in an inventory file.
+        2 - Worker, collect devices from the queue until it is empty.
+        3 - Merge the completed results and write the reports.
+        4 - Show the queue status.
+        """
+    )
+
+    return input("Choice: ").lower()
+
+
+def run():
+
+    """ Main Program """
+
+    from getpass import getpass
+    from datetime import datetime
+    from .auth import bind_backend
+    from .fleet import read_inventory
+    from .config_cache import cache_virtual_config
+    from .reports import COMPRESSIONS
+
+    queue_file = input('\nPlease enter the queue file (enter for {}): '
+                       .format(QUEUE_FILE)) or QUEUE_FILE
+
+    dm_val = None
+    while dm_val != 'q':
+        dm_val = distributed_menu()
+        match dm_val:
+            case '1':
+                os.system('cls')
+                inv_file = input('Please enter the name of the inventory '
+                                 'file: ')
+                inventory = read_inventory(inv_file)
+                queue_devices(inventory, queue_file)
+                print('\n{} devices queued in {}'.format(len(inventory),
+                                                         queue_file))
+                input('\nPress enter to return to the menu.')
+            case '2':
+                os.system('cls')
+                print('\nF5 REST API Authentication')
+                print('-'*30,)
+                username = input('\nPlease enter your username: ')
+                passwd = getpass('Please enter your password: ')
+
+                def make_api_get(device):
+                    return cache_virtual_config(
+                        bind_backend('basic', username, passwd, device),
+                        device)
+
+                collected = run_worker(make_api_get, queue_file)
+                print('\n{} devices collected by this worker.'
+                      .format(collected))
+                input('\nPress enter to return to the menu.')
+            case '3':
+                os.system('cls')
+                filename = input('\nPlease enter the name prefix of the files '
+                                 'you wish to save, the device, report name, '
+                                 'and the date and time will be suffixed to '
+                                 'the filename: ')
+                compression = input('\nCompress the files? (enter for none, '
+                                    'gzip or zstd): ').lower()
+                if compression not in COMPRESSIONS:
+                    compression = ''
+                dt_str = datetime.now().strftime('%d-%m-%y_%H%M%S')
+                incomplete = merge_results(filename, dt_str, compression,
+                                           queue_file)
+                for device, (state, error) in incomplete.items():
+                    print('Not merged', device, state, error or '')
+                input('\nPress enter to return to the menu.')
+            case '4':
+                os.system('cls')
+                for state, count in sorted(queue_status(queue_file).items()):
+                    print('{:<10}{}'.format(state, count))
+                input('\nPress enter to return to the menu.')
+            case 'q':
+                break
+            case _:
+                os.system('cls')
+                print('\Invalid input please try again.')
+                input('\nPress Enter to try again.')
@@ -0,0 +1,204 @@
+""" Maintains a small persistent index of when each F5 LTM Virtual Server and
+    Pool Member was last seen active, so the inactive report can be filtered
+    by how long a Virtual Server has been dormant without keeping every
+    snapshot of the stats.
+
+    The index is an SQLite database holding, per device and virtual server and
+    per device, pool and pool member, the last counter values seen, the last
+    time any counter moved and the first time the entry was seen. After each
+    'xref_pools' run only the rows whose counters moved are rewritten.
+
+    A virtual server's counters are its pool members' stats and, when it was
+    classified on them, its own clientside stats. A run that collected
+    neither for a virtual server leaves its entry as it is.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import json
+import time
+import sqlite3
+from .engine import virt_pools
+
+
+# Default location of the index, in the local directory
+INDEX_FILE = 'f5_dormancy_index.db'
+
+SECONDS_PER_DAY = 86400
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS virtuals (
+        device TEXT, virtual TEXT, counters TEXT,
+        last_changed REAL, first_seen REAL,
+        PRIMARY KEY (device, virtual));
+    CREATE TABLE IF NOT EXISTS members (
+        device TEXT, pool TEXT, member TEXT, counters TEXT,
+        last_changed REAL, first_seen REAL,
+        PRIMARY KEY (device, pool, member));
+"""
+
+# Insert new entries, only update existing ones when their counters moved
+UPSERT_VIRTUAL = """
+    INSERT INTO virtuals VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (device, virtual) DO UPDATE
+    SET counters = excluded.counters, last_changed = excluded.last_changed
+    WHERE counters != excluded.counters
+"""
+
+UPSERT_MEMBER = """
+    INSERT INTO members VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (device, pool, member) DO UPDATE
+    SET counters = excluded.counters, last_changed = excluded.last_changed
+    WHERE counters != excluded.counters
+"""
+
+
+# Copy another device's entries to the device, keeping the widest history
+MERGE_VIRTUALS = """
+    INSERT INTO virtuals
+    SELECT ?, virtual, counters, last_changed, first_seen FROM virtuals
+    WHERE device = ? AND true
+    ON CONFLICT (device, virtual) DO UPDATE
+    SET last_changed = max(last_changed, excluded.last_changed),
+        first_seen = min(first_seen, excluded.first_seen)
+"""
+
+MERGE_MEMBERS = """
+    INSERT INTO members
+    SELECT ?, pool, member, counters, last_changed, first_seen FROM members
+    WHERE device = ? AND true
+    ON CONFLICT (device, pool, member) DO UPDATE
+    SET last_changed = max(last_changed, excluded.last_changed),
+        first_seen = min(first_seen, excluded.first_seen)
+"""
+
+
+def open_index(index_file=INDEX_FILE):
+
+    """ Opens the index, creating it if it does not exist """
+
+    conn = sqlite3.connect(index_file)
+    conn.executescript(SCHEMA)
+
+    return conn
+
+
+def virt_counters(values):
+
+    """ Returns the counters of a virtual server as the sum of each stat
+        across its pool members, along with its clientside stats if they
+        were collected.
+    """
+
+    # Intialise variables
+    totals = dict(values.get('virt_clientside', {}))
+
+    for mem in values['virt_pool']['pool_mems']:
+        for stats in mem.values():
+            for stat, value in stats.items():
+                totals[stat] = totals.get(stat, 0) + value
+
+    return totals
+
+
+def update_index(device, virt_dict, index_file=INDEX_FILE, now=None):
+
+    """ Updates the index with the virtual servers and pool members in the
+        passed dictionary (as returned by 'xref_pools', active and inactive
+        combined) for the device. Returns the number of entries that were
+        added or whose counters moved.
+    """
+
+    if now is None:
+        now = time.time()
+
+    # Intialise variables
+    virt_rows = []
+    mem_rows = []
+
+    conn = open_index(index_file)
+    stored = dict(conn.execute('SELECT virtual, counters FROM virtuals '
+                               'WHERE device = ?', (device,)))
+
+    for virt, values in virt_dict.items():
+        counters = virt_counters(values)
+
+        # Keep the stored counters of stats not collected this run, so only
+        # the stats that were collected can move the entry
+        if counters and virt in stored:
+            counters = {**json.loads(stored[virt]), **counters}
+        if counters:
+            virt_rows.append((device, virt, json.dumps(counters,
+                                                       sort_keys=True),
+                              now, now))
+
+        for pool_name, pool_mems in virt_pools(values):
+            for mem in pool_mems:
+                for mem_id, stats in mem.items():
+                    if not mem_id:
+                        continue
+                    counters = json.dumps(stats, sort_keys=True)
+                    mem_rows.append((device, pool_name, mem_id, counters,
+                                     now, now))
+
+    with conn:
+        before = conn.total_changes
+        conn.executemany(UPSERT_VIRTUAL, virt_rows)
+        conn.executemany(UPSERT_MEMBER, mem_rows)
+        changed = conn.total_changes - before
+    conn.close()
+
+    return changed
+
+
+def merge_devices(device, others, index_file=INDEX_FILE):
+
+    """ Moves the entries of the 'others' devices, such as the other units of
+        an HA pair, to the device. Where both hold an entry the latest last
+        changed and earliest first seen times are kept.
+    """
+
+    conn = open_index(index_file)
+    with conn:
+        for other in others:
+            if other == device:
+                continue
+            conn.execute(MERGE_VIRTUALS, (device, other))
+            conn.execute(MERGE_MEMBERS, (device, other))
+            conn.execute('DELETE FROM virtuals WHERE device = ?', (other,))
+            conn.execute('DELETE FROM members WHERE device = ?', (other,))
+    conn.close()
+
+
+def dormant_virtuals(device, min_days, index_file=INDEX_FILE, now=None):
+
+    """ Returns the set of virtual server names on the device whose counters
+        have not moved for at least 'min_days' days.
+    """
+
+    if now is None:
+        now = time.time()
+
+    cutoff = now - min_days * SECONDS_PER_DAY
+
+    conn = open_index(index_file)
+    rows = conn.execute('SELECT virtual FROM virtuals '
+                        'WHERE device = ? AND last_changed <= ?',
+                        (device, cutoff)).fetchall()
+    conn.close()
+
+    return {row[0] for row in rows}
+
+
+def filter_dormant(virt_dict, device, min_days, index_file=INDEX_FILE):
+
+    """ Returns a copy of the passed dictionary with only the virtual servers
+        that have been dormant for at least 'min_days' days.
+    """
+
+    dormant = dormant_virtuals(device, min_days, index_file)
+
+    return {virt: values for virt, values in virt_dict.items()
+            if virt in dormant}
@@ -0,0 +1,65 @@
+""" Makes an API call to an F5 LTM appliance and writes the results to a text
+    file with pretty print. This is the single engine behind both the basic
+    and the token authentication API call tools.
+"""
+
+# Author: Wayne Bellward
+# Date: 31/10/2022
+
+
+import os
+
+
+def write_api(myapi):
+    
+    """ Write REST API call response to a text file with pretty print """
+
+    from pprint import pprint
+    from datetime import datetime
+
+    now = datetime.now()
+    dt_str = now.strftime('%d-%m-%y_%H%M%S')
+
+    suffix = '_' + dt_str
+
+    filename = input('\n\nPlease enter the name of the file you wish to save '
+                     'without the file extension: ')
+    filename = filename + suffix +'.txt'
+             
+    with open(filename, 'w') as file:
+        pprint(myapi, file)
+                
+    print('\nThe file has been written to timestamped "', filename,
+          '" in the local directory', sep = '')
+    print()
+
+
+def run(backend):
+
+    """ Main Program, 'backend' is the name of the authentication backend,
+        'basic' or 'token'.
+    """
+
+    from .engine import get_api_params
+    from .auth import bind_backend, backend_report
+
+    # Get input parameters for the F5 REST API call
+    username, passwd, ipaddr = get_api_params()
+    api_get = bind_backend(backend, username, passwd, ipaddr)
+
+    # Input URI extension for specific API call
+    print('\nThe Base URI is: https://{}/mgmt/tm/ltm/'.format(ipaddr))
+    uri_ext = input('Please enter the URI extension: ')
+
+    # Make REST API Get Call
+    myapi = api_get(uri_ext)
+
+    # Write the REST API response to a file
+    write_api(myapi)
+
+    # Report the authentication overhead saved by using a token
+    report = backend_report(backend, username, ipaddr)
+    if report:
+        print(report)
+
+    input('\nPress Enter to Exit')
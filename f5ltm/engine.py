@@ -0,0 +1,817 @@
+""" Imports an F5 LTM Virtual Server details and Pool stats from API. Coverts
+    the JSON output to a dictionary and extracts the relevant information to
+    ascertain if that Virtual Server/LTM Pool is in use or not.
+
+    This is the single engine behind both the basic and the token
+    authentication tools, 'run' takes the name of the authentication backend.
+    Only 'os' is imported up front, everything else is imported on first use
+    so the tools start quickly.
+
+    This program expects the following API URLs as follows:
+
+        https://<ip-address>/mgmt/tm/ltm/pool/members/stats
+        https://<ip-address>/mgmt/tm/ltm/virtual 
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2022
+
+
+import os
+
+
+VIRT_CSV_HEADER = ['Virtual Server Name', ',',
+                   'Virtual Server Destination IP', ',',
+                   'Virtual Server Destination Port', ',',
+                   'Virtual Server Description', ',',
+                   'Associated Pool Name', ',',
+                   'Pool Member 1', ',', 'Pool Member 2', ',',
+                   'Pool Member 3', ',', 'Pool Member 4', ',',
+                   'Pool Member 5', ',', 'Pool Member 6', ',',
+                   'Pool Member 7', ',', 'Pool Member 8', ',',
+                   'Pool Member 9', ',', 'Pool Member 10', ',',
+                   'Pool Member 11', ',', 'Pool Member 12',
+                   '\n']
+
+POOLMEM_CSV_HEADER = ['Pool Member Id', ',',
+                      'Server Side Bits In', ',',
+                      'Server Side Bits Out', ',',
+                      'Server Side Current Connections', ',',
+                      'Server Side Max Connections', ',',
+                      'Server Side Packets In', ',',
+                      'Server Side Packets Out', ',',
+                      'Server Side Total Connections', ',',
+                      '\n']
+
+# Pool member stats, in the order they are stored and written
+STAT_NAMES = ['serverside_bitsin', 'serverside_bitsout',
+              'serverside_curconns', 'serverside_maxconns',
+              'serverside_pktsin', 'serverside_pktsout',
+              'serverside_totconns']
+
+# iControl names of the pool member stats, to the names above
+API_STAT_NAMES = {'serverside.bitsIn': 'serverside_bitsin',
+                  'serverside.bitsOut': 'serverside_bitsout',
+                  'serverside.curConns': 'serverside_curconns',
+                  'serverside.maxConns': 'serverside_maxconns',
+                  'serverside.pktsIn': 'serverside_pktsin',
+                  'serverside.pktsOut': 'serverside_pktsout',
+                  'serverside.totConns': 'serverside_totconns'}
+
+
+def get_filename(message):
+
+    """ Get the user to input the filename they want to use to write a file """
+
+    from datetime import datetime
+
+    now = datetime.now()
+    dt_str = now.strftime('%d-%m-%y_%H%M%S')
+
+    filename = input(message)
+
+    return filename, dt_str
+    
+
+def write_api(myapi, dict_type):
+    
+    """ Unpack passed dictionary and write the virtual server info and dump
+        to a .csv file.
+    """
+
+    message = '\n\nPlease enter the name of the file you wish to save '
+    'without the file extension,\nactive or inactive will be '
+    'suffixed to the filename along with the date and time: '
+
+    filename, dt_str = get_filename(message)
+    suffix = '_'+ dict_type + '_' + dt_str
+    os.system('cls')
+    filename = filename + suffix +'.csv'
+
+    write_virt_csv(myapi, filename)
+                
+    print('\nThe file has been written to timestamped ', filename,
+          ' in the local directory', sep = '')
+    input('\nPress enter to return to options menu.')
+
+
+def write_virt_csv(myapi, filename):
+
+    """ Write the virtual server info in the passed dictionary to the named
+        .csv file, without prompting the user.
+    """
+
+    with open(filename, 'w') as file:
+
+        # Write header
+        file.writelines(VIRT_CSV_HEADER)
+
+        # Iterate over passed dictionary
+        for virt, params in myapi.items():
+            file.writelines(virt_csv_line(virt, params))
+
+
+def virt_pools(values):
+
+    """ Returns a virtual server's pools as a list of (pool name, pool
+        members) tuples. A virtual server without a default pool has the
+        pools its iRules and policies reference (see 'xref_pools'), if any,
+        otherwise its own 'NO POOL CONFIGURED' entry.
+    """
+
+    virt_pool = values['virt_pool']
+
+    if virt_pool.get('ref_pools'):
+        return [(ref_pool['pool_name'], ref_pool['pool_mems'])
+                for ref_pool in virt_pool['ref_pools']]
+
+    return [(virt_pool['pool_name'], virt_pool['pool_mems'])]
+
+
+def pool_label(virt_pool):
+
+    """ Returns the pool name shown for a virtual server, without its
+        partition. The names of referenced pools are joined by spaces.
+    """
+
+    pool_names = [ref_pool['pool_name']
+                  for ref_pool in virt_pool.get('ref_pools', [])]
+    try:
+        return ' '.join(pool_name.split('/')[2]
+                        for pool_name in pool_names or
+                        [virt_pool['pool_name']])
+    except IndexError:
+        return virt_pool['pool_name']
+
+
+def virt_csv_line(virt, params):
+
+    """ Unpack a virtual server's dictionary and return its .csv line as a
+        list of strings.
+    """
+
+    # Unpack dictionary
+    virt_dest = params['virt_dest'].split('/')[2]
+    virt_desc = params['virt_desc']
+    pool_name = pool_label(params['virt_pool'])
+
+    pool_mems = params['virt_pool']['pool_mems']
+
+    # Separate IP and port in the virtual server destination
+    virt_dest_ip = virt_dest.split(':')[0]
+    virt_dest_port = virt_dest.split(':')[1]
+
+    # Compose line to be written
+    line = [virt, ',', virt_dest_ip, ',', virt_dest_port, ',',
+            virt_desc, ',', pool_name]
+
+    # Unpack pool members list of dicts and add mem id to new list
+    for mem in pool_mems:
+        for mem_id in mem.keys():
+            line.append(',')
+            line.append(mem_id)
+
+    # Add a newline to the end of the line
+    line.append('\n')
+
+    return line
+
+
+def write_poolmem_stats(virt_dict):
+    
+    """ Unpack passed dictionary and write the stats of all pool members to a
+        .csv file.
+    """
+
+    os.system('cls')
+    message = '\n\nPlease enter the name of the file you wish to save '
+    'without the file extension,\nthe the date and time will'
+    'be suffixed to the filename: '
+              
+    filename, dt_str = get_filename(message)
+    suffix = '_' + dt_str
+    filename = filename + suffix +'.csv'
+
+    write_poolmem_csv(virt_dict, filename)
+                
+    print('\nThe file has been written to timestamped ', filename,
+          ' in the local directory', sep = '')
+    input('\nPress enter to return to options menu.')
+
+
+def write_idle_nodes(node_table):
+
+    """ Write the nodes which are entirely idle, no node level traffic across
+        any of their pools, to a .csv file.
+    """
+
+    from .nodes import idle_nodes, write_nodes_csv
+
+    message = ('\n\nPlease enter the name of the file you wish to save '
+               'without the file extension,\nidle_nodes will be '
+               'suffixed to the filename along with the date and time: ')
+
+    filename, dt_str = get_filename(message)
+    filename = filename + '_idle_nodes_' + dt_str + '.csv'
+    os.system('cls')
+
+    write_nodes_csv(idle_nodes(node_table), filename)
+
+    print('\nThe file has been written to timestamped ', filename,
+          ' in the local directory', sep = '')
+    input('\nPress enter to return to options menu.')
+
+
+def write_rollups_csv(rollups):
+
+    """ Write the pool, partition and device totals to a .csv file """
+
+    from .rollups import write_rollups
+
+    message = ('\n\nPlease enter the name of the file you wish to save '
+               'without the file extension,\ntotals will be '
+               'suffixed to the filename along with the date and time: ')
+
+    filename, dt_str = get_filename(message)
+    filename = filename + '_totals_' + dt_str + '.csv'
+    os.system('cls')
+
+    with open(filename, 'w') as file:
+        write_rollups(rollups, file)
+
+    print('\nThe file has been written to timestamped ', filename,
+          ' in the local directory', sep = '')
+    input('\nPress enter to return to options menu.')
+
+
+def write_poolmem_csv(virt_dict, filename):
+
+    """ Write the stats of all pool members in the passed dictionary to the
+        named .csv file, without prompting the user.
+    """
+
+    with open(filename, 'w') as file:
+
+        # Write header
+        file.writelines(POOLMEM_CSV_HEADER)
+
+        # Iterate over passed dictionary
+        for virt, params in virt_dict.items():
+            for line in poolmem_csv_lines(params):
+                file.writelines(line)
+
+
+def poolmem_csv_lines(params):
+
+    """ Unpack a virtual server's dictionary and yield the .csv line of each
+        of its pool members as a list of strings.
+    """
+
+    # Unpack dictionary
+    pool_mems = params['virt_pool']['pool_mems']
+
+    # Unpack pool members list of dicts and add mem id to new list
+    for mem in pool_mems:
+        for mem_id, stats in mem.items():
+            line = [mem_id]
+            for ss_stat, value in stats.items():
+                line.append(',')
+                line.append(str(value))
+
+            # Add a newline character to the end of the line
+            line.append('\n')
+            yield line
+
+
+def print_poolmem_stats(virt_dict):
+    
+    """ Unpack passed dictionary and print the stats of all pool members for a
+        single virtual server to the screen.
+    """
+
+    # Initalise Varibles
+    stat_names = {'serverside_bitsin': 'Server Side Bits In',
+                  'serverside_bitsout': 'Server Side Bits Out',
+                  'serverside_curconns': 'Server Side Current Conns',
+                  'serverside_maxconns': 'Server Side Max Conns',
+                  'serverside_pktsin': 'Server Side Packets In',
+                  'serverside_pktsout': 'Server Side Packets Out',
+                  'serverside_totconns': 'Server Side Total Conns'
+                  }
+
+    # Ask user to input the virtual server name
+    my_virt_stats = False
+    while not my_virt_stats:
+        
+        os.system('cls')
+        virt_id = input('\n\nThe virtual server name is case sensitive.\n\n'
+                        'Please enter the name of the virtual server you '
+                        'wish to view the pool member stats for: '
+                        )
+        try:
+            my_virt_stats = virt_dict[virt_id]
+        except KeyError:
+            input('\nVirtual server does not exist, press enter to try again.')
+
+    # Print the formatted output to the screen
+    os.system('cls')
+    print('\n\n')
+    print('='*60)
+    print(f"{'Virtual Server:':<18}{virt_id:<30}")
+    print('='*60)
+    print()
+
+    pool_name = pool_label(my_virt_stats['virt_pool'])
+
+    print(f"{'':<10}{'LTM Pool:':<10}{pool_name:<30}")
+    print(f"{'':<10}{'-'*50:<50}")
+    print()
+    
+    pool_mems = my_virt_stats['virt_pool']['pool_mems']
+    for mem in pool_mems:
+        for mem_id, stats in mem.items():
+            print()
+            print(f"{'':<20}{'Member:':<10}{mem_id:<20}")
+            print(f"{'':<20}{'-'*40:<40}")
+            print()
+            for stat, value in stats.items():
+                print(f"{'':<30}{stat_names[stat]:<30}{':':<3}{value:<10}")
+    
+    input('\nPress enter to return to options menu.')
+
+    
+def get_api_params():
+
+    """ Function to get input parameters for the F5 REST API call """
+
+    import ipaddress
+    from getpass import getpass
+
+    # Intialise variables
+    ipaddr = False
+
+    # Input F5 authentication credentials for REST API Call
+    print('\nF5 REST API Authentication')
+    print('-'*30,)
+    username = input('\nPlease enter your username: ')
+    passwd = getpass('Please enter your password: ')
+    os.system('cls')
+
+    # Input IP address of F5 LTM device, and loop until IP is valid
+    while not ipaddr:
+        try:
+            ipaddr = ipaddress.ip_network(input('Please enter the IP address '
+                                                'of the F5 LTM you want to '
+                                                'make the API call on: '))
+        except ValueError:
+            ipaddr = False
+            print('You entered an invalid IP address, please try again.\n')
+            
+    # Strip '/32' from the IP address and convert to a string
+    ipaddr = str(ipaddr).split('/')[0]
+
+    return username, passwd, ipaddr
+
+    
+def create_virt_dict(ltm_virt):
+
+    """ Takes the raw json output in the form of dictionary
+        from the API call and create new diction with only the
+        information we need.
+    """
+
+    #Intialise varibles
+    virt_dict = {}
+    virt_list = ltm_virt['items']
+
+    # Iterate over virtual server api response and create new dict with our info
+    for virt in virt_list:
+        virt_name = virt['name']
+        try:
+            virt_pool = virt['pool']
+        except KeyError:
+            virt_pool = 'NO POOL CONFIGURED'
+        virt_dest = virt['destination']
+        try:
+            virt_desc = virt['description']
+        except KeyError:
+            virt_desc = 'No Description'
+
+        virt_dict.update({virt_name: {'virt_desc': virt_desc,
+                                      'virt_dest': virt_dest,
+                                      'virt_pool': {'pool_name': virt_pool,
+                                                    'pool_mems': []
+                                                    }
+                                      }
+                          }
+                         )
+
+    return virt_dict
+
+
+def xref_pools(virt_dict, ltm_stats, node_table=None, rollups=None,
+               pool_refs=None):
+
+    """ Runs through the virt_dict and cross references it's pools against the
+        LTM Pool Stats to see if any of the virtual servers pools have traffic
+        against them. Based on the results the dictionary is split into two new
+        dictionaries, 'active' and 'inactive'.
+
+        If a node table is passed (see 'nodes'), member ids are shared through
+        it and each member is mapped to its node. If rollups are passed (see
+        'rollups'), the member stats are added to them in the same pass.
+
+        If pool references are passed (see 'pool_refs'), virtual servers
+        without a default pool are cross referenced against the pools their
+        iRules and policies reference. Each referenced pool with stats, and
+        its members, is kept in the virtual server's 'ref_pools' list, and
+        'pool_mems' holds the members of all of them.
+    """
+
+    if node_table is not None:
+        from .nodes import intern_member
+    if rollups is not None:
+        from .rollups import start_pass, add_member, end_pass
+        start_pass(rollups)
+
+    # Shallow copy virt_dict (virt_dict is also updated as part of this function)
+    virt_inact_dict = virt_dict.copy()
+
+    # Intialise varibles
+    virt_act_dict = {}
+    pool_ref_prefix = 'https://localhost/mgmt/tm/ltm/pool/members/'
+
+    # X-Ref the new virt dict with LTM pools to create active and inactive dict
+    for virt, values in virt_dict.items():
+
+        # Pool-less virtual servers use the pools their iRules and policies name
+        pool_names = [values['virt_pool']['pool_name']]
+        ref_pools = None
+        if pool_refs and virt in pool_refs \
+                and pool_names[0] == 'NO POOL CONFIGURED':
+            pool_names = pool_refs[virt]
+            ref_pools = []
+            values['virt_pool']['ref_pools'] = ref_pools
+
+        # Set virtual server status flag to False at the beginning iteration
+        virt_status = False
+        pool_found = False
+        for pool_name in pool_names:
+            pool_ref = pool_name.replace('/', '~')
+            pool_ref_stats = pool_ref_prefix + pool_ref + '/stats'
+            pool_ref_mems = pool_ref_prefix +  pool_ref + '/members/stats'
+
+            # Unpack Pool Members, skipping pools with no stats.
+            try:
+                ltm_mems = ltm_stats['entries'][pool_ref_stats]['nestedStats']\
+                           ['entries'][pool_ref_mems]['nestedStats']['entries']
+            except KeyError:
+                continue
+            pool_found = True
+            if ref_pools is not None:
+                ref_pools.append({'pool_name': pool_name, 'pool_mems': []})
+
+            for mem, params in ltm_mems.items():
+                mem_stats = params['nestedStats']['entries']
+
+                # Grab all stats for that pool member
+                ss_bitsin = (mem_stats['serverside.bitsIn']['value'])
+                ss_bitsout = (mem_stats['serverside.bitsOut']['value'])
+                ss_curconns = (mem_stats['serverside.curConns']['value'])
+                ss_maxconns = (mem_stats['serverside.maxConns']['value'])
+                ss_pktsin = (mem_stats['serverside.pktsIn']['value'])
+                ss_pktsout = (mem_stats['serverside.pktsOut']['value'])
+                ss_totconns = (mem_stats['serverside.totConns']['value'])
+
+                # Grab pool member IP address and port to form member id
+                if node_table is None:
+                    ipaddr = mem_stats['addr']['description']
+                    port = mem_stats['port']['value']
+                    mem_id = ipaddr + ':' + str(port)
+                else:
+                    mem_id = intern_member(node_table, mem_stats)
+
+                # Create member dictionary to append to pool member list
+                mem = {mem_id: {'serverside_bitsin': ss_bitsin,
+                                'serverside_bitsout': ss_bitsout,
+                                'serverside_curconns': ss_curconns,
+                                'serverside_maxconns': ss_maxconns,
+                                'serverside_pktsin': ss_pktsin,
+                                'serverside_pktsout': ss_pktsout,
+                                'serverside_totconns': ss_totconns
+                                }
+                       }
+                virt_inact_dict[virt]['virt_pool']['pool_mems'].append(mem)
+                if ref_pools is not None:
+                    ref_pools[-1]['pool_mems'].append(mem)
+                if rollups is not None:
+                    add_member(rollups, pool_name, mem_id, mem[mem_id])
+                mem = {}
+
+                # Form list of stats to evaluate as active or inactive member
+                eval_list = [ss_bitsin, ss_bitsout, ss_curconns, ss_maxconns,
+                             ss_pktsin, ss_pktsout, ss_totconns,]
+
+                # If any of the stats are not 0, set 'virt_status' to True as
+                # the virtual server must be active
+                if any(v != 0 for v in eval_list):
+                    virt_status = True
+                    eval_list = []
+                else:
+                    eval_list = []
+
+        # No pool stats at all, the virtual server is inactive
+        if not pool_found:
+            virt_inact_dict[virt]['virt_pool']['pool_mems'].append({'': {}})
+            continue
+
+        # If virt_status flag is true, pop that virt into an active dict
+        if virt_status == True:
+            virt_act_dict.update({virt: virt_inact_dict.pop(virt)})
+        else:
+            continue
+
+    if rollups is not None:
+        end_pass(rollups)
+
+    return virt_act_dict, virt_inact_dict
+
+
+def write_menu():
+    # Setup Write Menu Loop
+
+    os.system('cls')
+    mm_choice = None
+    while mm_choice != "q":
+        print(
+            """
+            Options Menu
+            -------------
+            
+            Q - Quit.
+            1 - Write the active virtual servers to a file.
+            2 - Write the inactive virtual servers to a file.
+            3 - Write all LTM pool member stats.
+            4 - Print a virtual servers pool members stats to the screen.
+            5 - Write all reports in a single pass, optionally compressed.
+            6 - Write the entirely idle nodes to a file.
+            7 - Write the pool, partition and device totals to a file.
+            8 - Write the top or bottom N virtual servers or pool members.
+            9 - Live view of a virtual servers pool members stats.
+            10 - Write the pool member stats to an Arrow or Parquet file.
+            """
+        )
+
+        mm_choice = input("Choice: ").lower()
+        print()
+        return mm_choice
+
+
+def get_collect_options():
+
+    """ Ask the user how the virtual servers should be collected and
+        classified, returns a dictionary of the options.
+    """
+
+    # Ask whether to report on only a subset of the virtual servers
+    print('\nPress enter at the following two prompts to report on all '
+          'virtual servers.')
+    partition = input('\nPlease enter the partition to report on: ')
+    pattern = input('Please enter a virtual server name pattern, e.g. '
+                    'app_*: ')
+    os.system('cls')
+
+    # Ask whether to classify on the virtual servers own clientside stats
+    vs_mode = input('\nClassify the virtual servers on their clientside stats?'
+                    '\n(n - no, a - also, i - instead of pool member stats): '
+                    ).lower()
+    os.system('cls')
+
+    # Ask whether to collect each partition separately, for large LTMs
+    by_partition = False
+    if vs_mode not in ('a', 'i') and not partition and not pattern:
+        by_partition = input('\nCollect each partition separately in '
+                             'parallel? (y/n): ').lower() == 'y'
+        os.system('cls')
+
+    # Ask whether to collect node level stats
+    nodes = input('\nCollect node level stats? (y/n): ').lower() == 'y'
+    os.system('cls')
+
+    options = {'partition': partition,
+               'pattern': pattern,
+               'vs_mode': vs_mode,
+               'by_partition': by_partition,
+               'nodes': nodes
+               }
+
+    return options
+
+
+def full_collection(options):
+
+    """ Returns True if the collect options cover every virtual server on the
+        device with its pool member stats, no partition or name pattern and
+        not classified on the clientside stats.
+    """
+
+    return (not options['partition'] and not options['pattern']
+            and options['vs_mode'] not in ('a', 'i'))
+
+
+def collect(api_get, options, rollups=None):
+
+    """ Makes the REST API calls and cross references the virtual servers
+        against the stats. Returns the virtual server dictionary, the active
+        and inactive dictionaries, and the node table (None unless node level
+        stats were collected). Passed rollups are updated in place.
+    """
+
+    from .partitions import collect_by_partition
+    from .selection import collect_selected, select_virtuals
+    from .virt_stats import classify_clientside, collect_walk_stats
+    from .pool_refs import get_pool_refs, add_pool_stats
+
+    partition = options['partition']
+    pattern = options['pattern']
+    vs_mode = options['vs_mode']
+
+    # Make REST API Call for node level stats, if asked for
+    node_table = None
+    if options.get('nodes'):
+        from .nodes import build_node_table
+        node_table = build_node_table(api_get('node/stats'))
+
+    if vs_mode in ('a', 'i'):
+        # Make REST API Calls for Virtual server details and stats
+        my_ltm_virt = select_virtuals(api_get('virtual'), partition, pattern)
+        virt_dict = create_virt_dict(my_ltm_virt)
+        virt_act_dict, virt_inact_dict, virt_walk_dict = classify_clientside(
+            virt_dict, api_get('virtual/stats'), walk=(vs_mode == 'a'))
+
+        # Walk the pool member stats only for the virtuals that need it
+        if virt_walk_dict:
+            ltm_stats = collect_walk_stats(api_get, virt_walk_dict)
+            walk_act_dict, walk_inact_dict = xref_pools(virt_walk_dict,
+                                                        ltm_stats, node_table,
+                                                        rollups)
+            virt_act_dict.update(walk_act_dict)
+            virt_inact_dict.update(walk_inact_dict)
+
+        return virt_dict, virt_act_dict, virt_inact_dict, node_table
+
+    if partition or pattern:
+        # Make REST API Calls for the selected virtuals and their pools
+        my_ltm_virt, ltm_stats = collect_selected(api_get, partition, pattern)
+    elif options['by_partition']:
+        # Make REST API Calls per partition and merge the results
+        my_ltm_virt, ltm_stats = collect_by_partition(api_get)
+    else:
+        # Make REST API Calls for LTM Pool stats and Virtual server details
+        ltm_stats = api_get('pool/members/stats')
+        my_ltm_virt = api_get('virtual')
+
+    # Find the pools referenced by the iRules and policies of pool-less virtuals
+    pool_refs = get_pool_refs(api_get, my_ltm_virt)
+    if partition or pattern:
+        ltm_stats = add_pool_stats(api_get, ltm_stats, pool_refs)
+
+    # Create new dictionary with selected virtual server parameters
+    virt_dict = create_virt_dict(my_ltm_virt)
+
+    # Create an active & inactive dictionary of virtual srvs based on pool stats
+    virt_act_dict, virt_inact_dict = xref_pools(virt_dict, ltm_stats,
+                                                node_table, rollups, pool_refs)
+
+    return virt_dict, virt_act_dict, virt_inact_dict, node_table
+
+
+def run(backend):
+
+    """ Main Program, 'backend' is the name of the authentication backend,
+        'basic' or 'token'.
+    """
+
+    from .auth import bind_backend, backend_report
+    from .dormancy import update_index
+    from .config_cache import cache_virtual_config
+    from .rollups import new_rollups
+    from time import time
+
+    # The modules behind the menu options are imported when chosen
+
+    # Get input parameters for the F5 REST API call
+    username, passwd, ipaddr = get_api_params()
+
+    # Bind the F5 credentials to the REST API call, serving the virtual
+    # server config from the cache while the config generation is unchanged
+    api_get = cache_virtual_config(bind_backend(backend, username, passwd,
+                                                ipaddr), ipaddr)
+
+    options = get_collect_options()
+
+    # Classified on the clientside stats only the walked virtual servers' pool
+    # members are seen, so the totals would be partial and are not kept
+    rollups = None
+    if options['vs_mode'] not in ('a', 'i'):
+        rollups = new_rollups(ipaddr)
+    collected = time()
+    virt_dict, virt_act_dict, virt_inact_dict, node_table = collect(api_get,
+                                                                    options,
+                                                                    rollups)
+    os.system('cls')
+
+    # Record when each virtual server and pool member was last seen active
+    update_index(ipaddr, {**virt_act_dict, **virt_inact_dict})
+
+    # Both replace everything held for the device, so only a run covering
+    # the whole device with its pool member stats may update them
+    if full_collection(options):
+        from .snapshot import write_snapshot, snapshot_filename
+        from .member_index import update_member_index
+
+        # Record which virtual servers are in front of each backend
+        update_member_index(ipaddr, {**virt_act_dict, **virt_inact_dict})
+
+        # Write a binary snapshot for later reporting without the LTM
+        write_snapshot(snapshot_filename(ipaddr), virt_act_dict,
+                       virt_inact_dict)
+
+    wm_val = None
+    while wm_val != 'q':
+        wm_val = write_menu()
+        match wm_val:
+            case '1':
+                os.system('cls')
+                print('\nWriting active virtual servers to a .csv file')
+                write_api(virt_act_dict, 'active')
+            case '2':
+                from .dormancy import filter_dormant
+                os.system('cls')
+                print('\nWriting inactive virtual servers to a .csv file')
+                min_days = input('\nOnly include virtual servers dormant for '
+                                 'at least how many days? (enter for all): ')
+                if min_days.isdigit():
+                    write_api(filter_dormant(virt_inact_dict, ipaddr,
+                                             int(min_days)), 'inactive')
+                else:
+                    write_api(virt_inact_dict, 'inactive')
+            case '3':
+                os.system('cls')
+                print('\nWriting LTM pool member stats to a .csv')
+                write_poolmem_stats(virt_dict)
+            case '4':
+                os.system('cls')
+                print('\nPrinting virtual servers pool members stats.')
+                print_poolmem_stats(virt_dict)   
+            case '5':
+                from .reports import write_all_reports_menu
+                os.system('cls')
+                print('\nWriting all reports to .csv files')
+                write_all_reports_menu(virt_dict, virt_act_dict, rollups)
+            case '6':
+                os.system('cls')
+                if node_table is None:
+                    input('\nNode level stats were not collected, press enter '
+                          'to return to options menu.')
+                    continue
+                print('\nWriting the entirely idle nodes to a .csv file')
+                write_idle_nodes(node_table)
+            case '7':
+                os.system('cls')
+                if rollups is None:
+                    input('\nTotals are not kept when classifying on the '
+                          'clientside stats, press enter to return to options '
+                          'menu.')
+                    continue
+                print('\nWriting the pool, partition and device totals to a '
+                      '.csv file')
+                write_rollups_csv(rollups)
+            case '8':
+                from .topn import write_top_n_menu
+                os.system('cls')
+                print('\nWriting the top or bottom N to a .csv file')
+                write_top_n_menu(virt_dict, virt_act_dict, ipaddr)
+            case '9':
+                from .live import live_view_menu
+                os.system('cls')
+                live_view_menu(api_get, virt_dict)
+            case '10':
+                from .columnar import write_columnar_menu
+                os.system('cls')
+                print('\nWriting LTM pool member stats to a columnar file')
+                write_columnar_menu(virt_dict, ipaddr, collected)
+            case 'q':
+                break
+            case _:
+                os.system('cls')
+                print('\Invalid input please try again.')
+                input('\nPress Enter to try again.')
+
+    # Report the authentication overhead saved by using a token
+    report = backend_report(backend, username, ipaddr)
+    if report:
+        print(report)
+
+    input('\nPress enter to exit script ')
+
@@ -0,0 +1,150 @@
+""" Collects F5 LTM Virtual Server details and Pool stats from a fleet of
+    LTMs listed in an inventory file, and writes the active and inactive
+    virtual servers and pool member stats for each to .csv files.
+
+    Both units of an HA pair may be listed in the inventory, the HA state of
+    each device is discovered (its device group membership cached per
+    inventory, its failover state checked every run) so the virtual server
+    config is fetched once per sync group and the pool stats only from the
+    units that are active for a traffic group. The dormancy and member
+    indexes are keyed by the IP address of the unit the config came from, as
+    the single device tools key them.
+
+    The inventory file has one F5 LTM IP address per line, blank lines and
+    lines starting with '#' are ignored.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+from .engine import create_virt_dict, xref_pools
+from .ha import merge_pool_stats
+
+
+def read_inventory(filename):
+
+    """ Reads the inventory file and returns a list of F5 LTM IP addresses """
+
+    import ipaddress
+
+    # Intialise variables
+    inventory = []
+
+    with open(filename) as file:
+        for line in file:
+            line = line.split('#')[0].strip()
+            if not line:
+                continue
+            try:
+                inventory.append(str(ipaddress.ip_address(line)))
+            except ValueError:
+                print('Skipping invalid IP address in inventory:', line)
+
+    return inventory
+
+
+def collect_group(api_gets, group_plan, rollups=None):
+
+    """ Collects the virtual server config and pool stats for one sync group
+        and returns the active and inactive virtual server dictionaries.
+        Passed rollups are updated in place.
+    """
+
+    from .pool_refs import get_pool_refs
+
+    # Config is in sync across the group, fetch it once
+    config_get = api_gets[group_plan['config_from']]
+    my_ltm_virt = config_get('virtual')
+    pool_refs = get_pool_refs(config_get, my_ltm_virt)
+
+    # Fetch stats only from the active units and merge them
+    ltm_stats = merge_pool_stats([api_gets[ipaddr]('pool/members/stats')
+                                  for ipaddr in group_plan['stats_from']])
+
+    virt_dict = create_virt_dict(my_ltm_virt)
+
+    return xref_pools(virt_dict, ltm_stats, rollups=rollups,
+                      pool_refs=pool_refs)
+
+
+def run():
+
+    """ Main Program """
+
+    from getpass import getpass
+    from datetime import datetime
+    from .auth import bind_backend
+    from .dormancy import update_index, merge_devices
+    from .config_cache import cache_virtual_config
+    from .ha import get_inventory_ha_state, plan_collection
+    from .reports import write_all_reports, COMPRESSIONS
+    from .member_index import update_member_index
+    from .rollups import new_rollups
+
+    # Input F5 authentication credentials for REST API Call
+    print('\nF5 REST API Authentication')
+    print('-'*30,)
+    username = input('\nPlease enter your username: ')
+    passwd = getpass('Please enter your password: ')
+    os.system('cls')
+
+    inv_file = input('Please enter the name of the inventory file: ')
+    inventory = read_inventory(inv_file)
+
+    # Bind the credentials of each device to the GET call, exchanged for a
+    # token on the first call unless token login is disabled on the device
+    api_gets = {}
+    for ipaddr in inventory:
+        api_gets[ipaddr] = cache_virtual_config(bind_backend('basic', username,
+                                                             passwd, ipaddr),
+                                                ipaddr)
+
+    # Discover HA state (membership cached per inventory) and plan the
+    # collection
+    ha_map = get_inventory_ha_state(api_gets, inv_file + '.ha_cache.json')
+    plan = plan_collection(ha_map)
+
+    filename = input('\nPlease enter the name prefix of the files you wish to '
+                     'save, the sync group, report name, and the date '
+                     'and time will be suffixed to the filename: ')
+    compression = input('\nCompress the files? (enter for none, gzip or '
+                        'zstd): ').lower()
+    if compression not in COMPRESSIONS:
+        compression = ''
+    dt_str = datetime.now().strftime('%d-%m-%y_%H%M%S')
+
+    for group, group_plan in plan.items():
+        print('\nCollecting sync group', group, 'config from',
+              group_plan['config_from'], 'stats from',
+              ', '.join(group_plan['stats_from']))
+        rollups = new_rollups(group)
+        virt_act_dict, virt_inact_dict = collect_group(api_gets, group_plan,
+                                                       rollups)
+
+        # The indexes are keyed by the IP address the config came from, as
+        # the single device tools are, taking over the entries held under
+        # the group's other units and the group itself
+        device = group_plan['config_from']
+        others = [unit for unit in group_plan['units'] if unit != device]
+        merge_devices(device, others + [group])
+
+        # Record when each virtual server and pool member was last seen active
+        update_index(device, {**virt_act_dict, **virt_inact_dict})
+
+        # Record which virtual servers are in front of each backend
+        update_member_index(device, {**virt_act_dict, **virt_inact_dict},
+                            replaces=others + [group])
+
+        # Write all the reports for the group in one pass
+        group_name = group.strip('/').replace('/', '_')
+        filenames = write_all_reports({**virt_act_dict, **virt_inact_dict},
+                                      virt_act_dict,
+                                      filename + '_' + group_name, dt_str,
+                                      compression, rollups)
+        for group_file in filenames.values():
+            print('The file has been written to', group_file)
+
+    input('\nPress enter to exit script ')
+
@@ -0,0 +1,290 @@
+""" Discovers the HA (device group and failover) state of F5 LTM appliances so
+    that a fleet collection only asks each HA pair for what it needs. Config
+    is fetched once per sync-failover device group and stats only from the
+    units that are active for a traffic group.
+
+    Device group membership rarely changes and is cached, the failover state
+    can change at any time and is checked on every run.
+
+    This module expects the following API URLs as follows:
+
+        https://<ip-address>/mgmt/tm/cm/failover-status
+        https://<ip-address>/mgmt/tm/cm/device
+        https://<ip-address>/mgmt/tm/cm/device-group
+        https://<ip-address>/mgmt/tm/cm/traffic-group/stats
+
+    The 'api_get' arguments below are the F5 GET call with the device
+    credentials already bound, as returned by 'auth.bind_backend'.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import copy
+import json
+import time
+import hashlib
+
+
+# How long cached device group membership stays valid for, in seconds
+HA_CACHE_MAX_AGE = 3600
+
+
+def get_failover_status(api_get):
+
+    """ Returns the failover status of the device, e.g. 'ACTIVE', 'STANDBY'
+        or 'OFFLINE'.
+    """
+
+    failover = api_get('failover-status', module='cm')
+
+    # There is only ever one entry, take the status from it
+    for entry in failover.get('entries', {}).values():
+        status = entry['nestedStats']['entries']['status']['description']
+        return status.upper()
+
+    return 'UNKNOWN'
+
+
+def get_self_device(api_get):
+
+    """ Returns the name of the device the API call was made on, as it is
+        known within the device trust.
+    """
+
+    devices = api_get('device', module='cm')
+
+    for device in devices.get('items', []):
+        if device.get('selfDevice') == 'true':
+            return device['name']
+
+    return None
+
+
+def get_sync_group(api_get, device_name):
+
+    """ Returns the name of the sync-failover device group the device is a
+        member of and the sorted names of its member devices, or None and an
+        empty list if the device is standalone.
+    """
+
+    dev_groups = api_get('device-group?expandSubcollections=true', module='cm')
+
+    for dev_group in dev_groups.get('items', []):
+        if dev_group.get('type') != 'sync-failover':
+            continue
+        members = [member['name'] for member in
+                   dev_group.get('devicesReference', {}).get('items', [])]
+        if device_name in members:
+            return dev_group['fullPath'], sorted(members)
+
+    return None, []
+
+
+def get_traffic_groups(api_get, device_name):
+
+    """ Returns a dictionary of the traffic groups known to the device, with
+        the failover state of this device for each, e.g.
+
+            {'/Common/traffic-group-1': 'active'}
+    """
+
+    # Intialise variables
+    traffic_groups = {}
+
+    tg_stats = api_get('traffic-group/stats', module='cm')
+
+    # Stats are reported per traffic group per device, keep this device's
+    for entry in tg_stats.get('entries', {}).values():
+        tg_entry = entry['nestedStats']['entries']
+        tg_device = tg_entry['deviceName']['description'].split('/')[-1]
+        if tg_device != device_name:
+            continue
+        tg_name = tg_entry['trafficGroup']['description']
+        traffic_groups[tg_name] = tg_entry['failoverState']['description']
+
+    return traffic_groups
+
+
+def get_membership(api_get):
+
+    """ Discovers the device group membership of a single device and
+        returns it as a dictionary.
+    """
+
+    device_name = get_self_device(api_get)
+    sync_group, sync_members = get_sync_group(api_get, device_name)
+
+    membership = {'device_name': device_name,
+                  'sync_group': sync_group,
+                  'sync_members': sync_members
+                  }
+
+    return membership
+
+
+def get_ha_state(api_get, membership=None):
+
+    """ Discovers the HA state of a single device and returns it as a
+        dictionary. Only the failover state is fetched if the device's
+        membership is passed.
+    """
+
+    if membership is None:
+        membership = get_membership(api_get)
+
+    ha_state = {**membership,
+                'failover_status': get_failover_status(api_get),
+                'traffic_groups': get_traffic_groups(
+                    api_get, membership['device_name'])
+                }
+
+    return ha_state
+
+
+def inventory_hash(inventory):
+
+    """ Returns a checksum of the inventory so a cache is only reused for the
+        same set of devices.
+    """
+
+    return hashlib.sha1('\n'.join(sorted(inventory)).encode()).hexdigest()
+
+
+def get_inventory_ha_state(api_gets, cache_file, max_age=HA_CACHE_MAX_AGE):
+
+    """ Discovers the HA state of every device in the inventory. 'api_gets' is
+        a dictionary of device IP address to bound GET call. The device group
+        membership is cached in 'cache_file' and reused while the inventory is
+        unchanged and the cache is younger than 'max_age' seconds, the
+        failover state is always fetched so a failover is seen straight away.
+    """
+
+    # Intialise variables
+    inv_hash = inventory_hash(api_gets.keys())
+    memberships = None
+
+    # Reuse the cached membership if it is for this inventory and still fresh
+    try:
+        with open(cache_file) as file:
+            cache = json.load(file)
+        if (cache['inventory_hash'] == inv_hash
+                and time.time() - cache['timestamp'] < max_age):
+            memberships = cache['memberships']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    if memberships is None:
+        memberships = {ipaddr: get_membership(api_get)
+                       for ipaddr, api_get in api_gets.items()}
+        cache = {'inventory_hash': inv_hash,
+                 'timestamp': time.time(),
+                 'memberships': memberships
+                 }
+        with open(cache_file, 'w') as file:
+            json.dump(cache, file, indent=2)
+
+    ha_map = {}
+    for ipaddr, api_get in api_gets.items():
+        ha_map[ipaddr] = get_ha_state(api_get, memberships[ipaddr])
+
+    return ha_map
+
+
+def group_key(ipaddr, ha_state):
+
+    """ Returns the key of the sync group the device is collected with. HA
+        pairs often reuse the same device group name, so the group is keyed
+        by its name and member devices, e.g.
+
+            /Common/failover-dg/bigip1.example.com+bigip2.example.com
+
+        A standalone device is a group of its own, keyed by its IP address.
+    """
+
+    if not ha_state['sync_group']:
+        return ipaddr
+
+    return ha_state['sync_group'] + '/' + '+'.join(ha_state['sync_members'])
+
+
+def plan_collection(ha_map):
+
+    """ Works out which devices to collect from. Returns a dictionary keyed by
+        sync group (see 'group_key') with the device to fetch the config from,
+        the devices to fetch stats from and all the group's devices.
+    """
+
+    # Intialise variables
+    groups = {}
+
+    # Group devices by sync group
+    for ipaddr, ha_state in ha_map.items():
+        groups.setdefault(group_key(ipaddr, ha_state), []).append(ipaddr)
+
+    plan = {}
+    for group, members in groups.items():
+        # Stats only from devices which are active for any traffic group
+        stats_from = [ipaddr for ipaddr in members
+                      if 'active' in ha_map[ipaddr]['traffic_groups'].values()]
+
+        # Fall back to devices reporting as active, then to all of them
+        if not stats_from:
+            stats_from = [ipaddr for ipaddr in members
+                          if ha_map[ipaddr]['failover_status'] == 'ACTIVE']
+        if not stats_from:
+            stats_from = members
+
+        # Config is in sync across the group, take it from the first active
+        plan[group] = {'config_from': stats_from[0],
+                       'stats_from': stats_from,
+                       'units': members
+                       }
+
+    return plan
+
+
+def merge_pool_stats(ltm_stats_list):
+
+    """ Merges the 'pool/members/stats' responses from several units of the
+        same sync group into one. Counters are summed, max connections takes
+        the highest value.
+    """
+
+    # Intialise variables
+    merged = {'entries': {}}
+
+    for ltm_stats in ltm_stats_list:
+        for pool_ref, pool in ltm_stats.get('entries', {}).items():
+            if pool_ref not in merged['entries']:
+                merged['entries'][pool_ref] = copy.deepcopy(pool)
+                continue
+            merged_pool = merged['entries'][pool_ref]['nestedStats']['entries']
+            for mems_ref, mems in pool['nestedStats']['entries'].items():
+                if mems_ref not in merged_pool:
+                    merged_pool[mems_ref] = copy.deepcopy(mems)
+                    continue
+                merged_mems = merged_pool[mems_ref]['nestedStats']['entries']
+                for mem, params in mems['nestedStats']['entries'].items():
+                    if mem not in merged_mems:
+                        merged_mems[mem] = copy.deepcopy(params)
+                        continue
+                    merge_mem_stats(merged_mems[mem]['nestedStats']['entries'],
+                                    params['nestedStats']['entries'])
+
+    return merged
+
+
+def merge_mem_stats(merged_stats, mem_stats):
+
+    """ Adds the counters of one pool member stats entry into another """
+
+    for stat, value in mem_stats.items():
+        if not stat.startswith('serverside.') or 'value' not in value:
+            continue
+        if stat == 'serverside.maxConns':
+            merged_stats[stat]['value'] = max(merged_stats[stat]['value'],
+                                              value['value'])
+        else:
+            merged_stats[stat]['value'] += value['value']
@@ -0,0 +1,217 @@
+""" Live, refreshing terminal view of a virtual server's pool member stats.
+
+    Only the selected virtual server's pool member stats are polled, at a set
+    interval. Each poll is rendered into a frame, a list of screen lines, and
+    only the lines that differ from the last frame are redrawn, in a single
+    write using ANSI cursor positioning. A failed poll is shown in the frame
+    and retried at the next interval.
+
+    This module expects the following API URLs as follows:
+
+        https://<ip-address>/mgmt/tm/ltm/pool/<pool>/members/stats
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+import sys
+import time
+from .engine import API_STAT_NAMES, virt_pools
+from .client import raise_request_errors
+from .deltas import new_delta_store, update_deltas
+
+
+# Default and minimum seconds between polls. Polls closer together than the
+# single flight freshness window would be served the last poll's result.
+INTERVAL = 5.0
+MIN_INTERVAL = 3.0
+
+# Frame columns, heading and width
+COLUMNS = [('Member', 24), ('Cur Conns', 11), ('Max Conns', 11),
+           ('Conns/s', 11), ('Bits In/s', 14), ('Bits Out/s', 14),
+           ('Pkts In/s', 12), ('Pkts Out/s', 12)]
+
+# ANSI escape sequences
+CLEAR_SCREEN = '\x1b[2J'
+CLEAR_LINE = '\x1b[K'
+MOVE_TO = '\x1b[{};1H'
+
+
+def read_member_stats(pool_mems):
+
+    """ Takes a 'pool/<pool>/members/stats' response and returns a
+        dictionary of member id to its stats.
+    """
+
+    # Intialise variables
+    members = {}
+
+    for entry in pool_mems.get('entries', {}).values():
+        stats = entry['nestedStats']['entries']
+        mem_id = (stats['addr']['description'] + ':'
+                  + str(stats['port']['value']))
+        members[mem_id] = {our_name: stats[api_name]['value']
+                           for api_name, our_name in API_STAT_NAMES.items()
+                           if api_name in stats}
+
+    return members
+
+
+def format_rate(rate):
+
+    """ Formats a rate per second, '-' if there is none yet """
+
+    if rate is None:
+        return '-'
+
+    return '{:,.0f}'.format(rate)
+
+
+def build_frame(virt_id, pool_name, members, deltas, interval, stamp,
+                error=None):
+
+    """ Returns the frame for one poll as a list of screen lines. 'deltas'
+        is the member rates from 'update_deltas', members whose counters
+        were reset since the last poll are marked. If the poll failed,
+        'error' is shown under the members of the last good poll.
+    """
+
+    frame = ['Virtual Server: {}'.format(virt_id),
+             'LTM Pool:       {}'.format(pool_name),
+             'Polled {} every {}s, press Ctrl+C to stop'.format(stamp,
+                                                                 interval),
+             '',
+             ''.join(heading.ljust(width) for heading, width in COLUMNS),
+             '-' * sum(width for heading, width in COLUMNS)]
+
+    for mem_id in sorted(members):
+        stats = members[mem_id]
+        mem_deltas = deltas.get(mem_id, {'rates': {}, 'reset': False})
+        mem_rates = mem_deltas['rates']
+        values = [mem_id + (' *reset' if mem_deltas['reset'] else ''),
+                  '{:,}'.format(stats.get('serverside_curconns', 0)),
+                  '{:,}'.format(stats.get('serverside_maxconns', 0)),
+                  format_rate(mem_rates.get('serverside_totconns')),
+                  format_rate(mem_rates.get('serverside_bitsin')),
+                  format_rate(mem_rates.get('serverside_bitsout')),
+                  format_rate(mem_rates.get('serverside_pktsin')),
+                  format_rate(mem_rates.get('serverside_pktsout'))]
+        frame.append(''.join(value.ljust(width)
+                             for value, (heading, width)
+                             in zip(values, COLUMNS)))
+
+    if not members:
+        frame.append('No pool members found.')
+
+    if error is not None:
+        frame += ['', 'Poll failed, retrying: {}'.format(error)]
+
+    return frame
+
+
+def render(frame, last_frame):
+
+    """ Returns the output that updates the screen from 'last_frame' to
+        'frame', redrawing only the lines which have changed.
+    """
+
+    # Intialise variables
+    out = []
+
+    for row, line in enumerate(frame):
+        if row >= len(last_frame) or last_frame[row] != line:
+            out.append(MOVE_TO.format(row + 1) + line + CLEAR_LINE)
+
+    # Blank any lines left over from a longer last frame
+    for row in range(len(frame), len(last_frame)):
+        out.append(MOVE_TO.format(row + 1) + CLEAR_LINE)
+
+    return ''.join(out)
+
+
+def live_view(api_get, virt_id, pool_name, interval=INTERVAL,
+              stream=sys.stdout, polls=None):
+
+    """ Polls the pool's member stats every 'interval' seconds and redraws
+        the changed lines, until Ctrl+C (or 'polls' polls have been made).
+    """
+
+    import requests
+
+    # Intialise variables
+    pool_uri = 'pool/' + pool_name.replace('/', '~') + '/members/stats'
+    store = new_delta_store()
+    members = {}
+    last_frame = []
+    poll = 0
+
+    stream.write(CLEAR_SCREEN)
+    try:
+        while polls is None or poll < polls:
+            poll_time = time.monotonic()
+            error = None
+            try:
+                with raise_request_errors():
+                    members = read_member_stats(api_get(pool_uri))
+                deltas = update_deltas(store, members.items(), poll_time)
+            except requests.exceptions.RequestException as err_re:
+                error = err_re
+                deltas = {}
+
+            frame = build_frame(virt_id, pool_name, members, deltas, interval,
+                                time.strftime('%H:%M:%S'), error)
+            stream.write(render(frame, last_frame))
+            stream.write(MOVE_TO.format(len(frame) + 2))
+            stream.flush()
+
+            last_frame = frame
+            poll += 1
+            if polls is None or poll < polls:
+                time.sleep(max(0, interval - (time.monotonic() - poll_time)))
+    except KeyboardInterrupt:
+        pass
+
+
+def live_view_menu(api_get, virt_dict):
+
+    """ Ask the user for the virtual server and interval and show the live
+        view of its pool members.
+    """
+
+    # Ask user to input the virtual server name
+    my_virt_stats = False
+    while not my_virt_stats:
+
+        os.system('cls')
+        virt_id = input('\n\nThe virtual server name is case sensitive.\n\n'
+                        'Please enter the name of the virtual server you '
+                        'wish to watch the pool member stats for: '
+                        )
+        try:
+            my_virt_stats = virt_dict[virt_id]
+        except KeyError:
+            input('\nVirtual server does not exist, press enter to try again.')
+            continue
+
+        # Only a virtual server with a single pool can be watched, its own or
+        # the one its iRules and policies reference
+        pools = virt_pools(my_virt_stats)
+        pool_name = pools[0][0]
+        if len(pools) != 1 or pool_name == 'NO POOL CONFIGURED':
+            my_virt_stats = False
+            input('\nVirtual server does not have a single pool to watch, '
+                  'press enter to try again.')
+
+    interval = input('\nSeconds between updates, at least {} (enter for '
+                     '{}): '.format(MIN_INTERVAL, INTERVAL))
+    try:
+        interval = max(float(interval), MIN_INTERVAL)
+    except ValueError:
+        interval = INTERVAL
+
+    os.system('cls')
+    live_view(api_get, virt_id, pool_name, interval)
+
+    input('\nPress enter to return to options menu.')
@@ -0,0 +1,156 @@
+""" Fleet wide persistent inverted index from backend pool member address
+    (and port) to the virtual servers in front of it, so server
+    decommissions can find every affected virtual server on every LTM
+    without contacting the devices.
+
+    The index is an SQLite database rebuilt per device after each
+    collection. Addresses are stored as fixed width big endian bytes with an
+    index on (IP version, address), so both exact and CIDR range lookups are
+    a range scan of the sorted index.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import sqlite3
+import ipaddress
+from .engine import virt_pools
+
+
+# Default location of the index, in the local directory
+INDEX_FILE = 'f5_member_index.db'
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS members (
+        version INTEGER, addr BLOB, port INTEGER,
+        device TEXT, partition TEXT, virtual TEXT, pool TEXT);
+    CREATE INDEX IF NOT EXISTS members_addr ON members (version, addr, port);
+    CREATE INDEX IF NOT EXISTS members_device ON members (device);
+"""
+
+
+def open_index(index_file=INDEX_FILE):
+
+    """ Opens the index, creating it if it does not exist """
+
+    conn = sqlite3.connect(index_file)
+    conn.executescript(SCHEMA)
+
+    return conn
+
+
+def split_mem_id(mem_id):
+
+    """ Splits a pool member id, 'address:port', into an ip_address and port.
+        Any route domain, '%<id>', is dropped from the address.
+    """
+
+    addr, port = mem_id.rsplit(':', 1)
+    addr = addr.split('%')[0]
+
+    return ipaddress.ip_address(addr), int(port)
+
+
+def update_member_index(device, virt_dict, index_file=INDEX_FILE,
+                        replaces=()):
+
+    """ Replaces the device's entries in the index with the pool members of
+        the passed dictionary (as returned by 'xref_pools', active and
+        inactive combined). The entries of any devices in 'replaces', such
+        as the other units of an HA pair, are removed too.
+    """
+
+    # Intialise variables
+    rows = []
+
+    for virt, values in virt_dict.items():
+        partition = values['virt_dest'].split('/')[1]
+        for pool_name, pool_mems in virt_pools(values):
+            for mem in pool_mems:
+                for mem_id in mem:
+                    if not mem_id:
+                        continue
+                    try:
+                        addr, port = split_mem_id(mem_id)
+                    except ValueError:
+                        continue
+                    rows.append((addr.version, addr.packed, port, device,
+                                 partition, virt, pool_name))
+
+    conn = open_index(index_file)
+    with conn:
+        conn.executemany('DELETE FROM members WHERE device = ?',
+                         [(key,) for key in (device,) + tuple(replaces)])
+        conn.executemany('INSERT INTO members VALUES (?, ?, ?, ?, ?, ?, ?)',
+                         rows)
+    conn.close()
+
+
+def lookup_members(query, index_file=INDEX_FILE):
+
+    """ Looks up the virtual servers in front of a backend. 'query' is an IP
+        address, 'address:port' or a CIDR range such as '10.1.0.0/24'.
+        Returns a list of dictionaries, one per pool member found.
+    """
+
+    port = None
+    if '/' in query:
+        network = ipaddress.ip_network(query, strict=False)
+    else:
+        try:
+            network = ipaddress.ip_network(query)
+        except ValueError:
+            addr, port = split_mem_id(query)
+            network = ipaddress.ip_network(addr)
+
+    sql = ('SELECT addr, port, device, partition, virtual, pool FROM members '
+           'WHERE version = ? AND addr BETWEEN ? AND ?')
+    params = [network.version, network.network_address.packed,
+              network.broadcast_address.packed]
+    if port is not None:
+        sql += ' AND port = ?'
+        params.append(port)
+    sql += ' ORDER BY addr, port, device, virtual'
+
+    conn = open_index(index_file)
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+
+    return [{'member': str(ipaddress.ip_address(addr)) + ':' + str(port),
+             'device': device,
+             'partition': partition,
+             'virtual': virtual,
+             'pool': pool}
+            for addr, port, device, partition, virtual, pool in rows]
+
+
+def run():
+
+    """ Main Program, looks up backends in the index until the user quits """
+
+    import os
+
+    query = None
+    while query != 'q':
+        os.system('cls')
+        query = input('\nPlease enter a backend IP address, address:port or '
+                      'CIDR range to look up (q to quit): ').strip()
+        if query.lower() == 'q':
+            break
+        try:
+            results = lookup_members(query)
+        except ValueError:
+            input('\nInvalid address or range, press enter to try again.')
+            continue
+
+        print()
+        print(f"{'Member':<30}{'Device':<20}{'Partition':<15}"
+              f"{'Virtual Server':<30}{'Pool':<30}")
+        print('-'*125)
+        for result in results:
+            print(f"{result['member']:<30}{result['device']:<20}"
+                  f"{result['partition']:<15}{result['virtual']:<30}"
+                  f"{result['pool']:<30}")
+        print('\n{} pool members found.'.format(len(results)))
+        input('\nPress enter to look up another backend.')
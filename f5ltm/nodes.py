@@ -0,0 +1,131 @@
+""" Node level stats and a node table shared by all the pools.
+
+    The same backend nodes appear in many pools. The node table holds each
+    node once, with its node level serverside stats, and pool members are
+    mapped to their node by ID. Member ids ('address:port') are built once
+    per distinct member and shared by every pool the member is in, so member
+    records no longer duplicate the address data.
+
+    Node activity, and whether a node is entirely idle, is then a single
+    lookup rather than a walk of every pool the node is in.
+
+    This module expects the following API URLs as follows:
+
+        https://<ip-address>/mgmt/tm/ltm/node/stats
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+from .engine import API_STAT_NAMES
+
+
+# Node level stats are read with the pool member stat names
+NODE_CSV_HEADER = (['Node Name', 'Node Address', 'Pool Members']
+                   + list(API_STAT_NAMES.values()))
+
+
+def build_node_table(node_stats):
+
+    """ Takes the 'node/stats' response and returns the node table, a
+        dictionary of the list of nodes and the indexes used to find them.
+    """
+
+    node_table = {'nodes': [],
+                  'by_name': {},
+                  'by_addr': {},
+                  'member_ids': {},
+                  'member_nodes': {}
+                  }
+
+    for entry in node_stats.get('entries', {}).values():
+        stats = entry['nestedStats']['entries']
+        node_name = stats['tmName']['description']
+        addr = stats['addr']['description']
+
+        node = {'node_name': node_name,
+                'addr': addr,
+                'stats': {our_name: stats[api_name]['value']
+                          for api_name, our_name in API_STAT_NAMES.items()
+                          if api_name in stats},
+                'members': []
+                }
+
+        node_id = len(node_table['nodes'])
+        node_table['nodes'].append(node)
+        node_table['by_name'][node_name] = node_id
+        node_table['by_addr'].setdefault(addr, node_id)
+
+    return node_table
+
+
+def intern_member(node_table, mem_stats):
+
+    """ Returns the member id for a pool member stats entry. The id is only
+        built the first time the member is seen, and the member is mapped to
+        its node ID.
+    """
+
+    ipaddr = mem_stats['addr']['description']
+    port = mem_stats['port']['value']
+
+    mem_id = node_table['member_ids'].get((ipaddr, port))
+    if mem_id is not None:
+        return mem_id
+
+    mem_id = ipaddr + ':' + str(port)
+    node_table['member_ids'][(ipaddr, port)] = mem_id
+
+    # Find the member's node by name, falling back to its address
+    node_name = mem_stats.get('nodeName', {}).get('description')
+    node_id = node_table['by_name'].get(node_name,
+                                        node_table['by_addr'].get(ipaddr))
+    node_table['member_nodes'][mem_id] = node_id
+    if node_id is not None:
+        node_table['nodes'][node_id]['members'].append(mem_id)
+
+    return mem_id
+
+
+def member_node(node_table, mem_id):
+
+    """ Returns the node record for a pool member id, or None """
+
+    node_id = node_table['member_nodes'].get(mem_id)
+    if node_id is None:
+        return None
+
+    return node_table['nodes'][node_id]
+
+
+def node_active(node):
+
+    """ Returns True if any of the node's stats are not 0 """
+
+    return any(value != 0 for value in node['stats'].values())
+
+
+def idle_nodes(node_table):
+
+    """ Returns the list of nodes which are entirely idle, no node level
+        traffic across all the pools they are in.
+    """
+
+    return [node for node in node_table['nodes'] if not node_active(node)]
+
+
+def write_nodes_csv(nodes, filename):
+
+    """ Write the passed nodes and their node level stats to the named .csv
+        file.
+    """
+
+    with open(filename, 'w') as file:
+        file.write(','.join(NODE_CSV_HEADER) + '\n')
+        for node in nodes:
+            line = [node['node_name'], node['addr'],
+                    str(len(node['members']))]
+            line += [str(node['stats'].get(stat, 0))
+                     for stat in API_STAT_NAMES.values()]
+            file.write(','.join(line) + '\n')
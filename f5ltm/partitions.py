@@ -0,0 +1,79 @@
+""" Collects the F5 LTM Virtual Server details and Pool stats one
+    administrative partition at a time, in parallel, and merges the shards
+    back into the same structure a single API call returns. On an LTM with a
+    large number of partitions this keeps each response small and spreads the
+    work across restjavad rather than timing out on one huge response.
+
+    This module expects the following API URLs as follows:
+
+        https://<ip-address>/mgmt/tm/auth/partition
+        https://<ip-address>/mgmt/tm/ltm/pool/members/stats?$filter=partition eq <partition>
+        https://<ip-address>/mgmt/tm/ltm/virtual?$filter=partition eq <partition>
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Number of partitions to collect at the same time
+MAX_WORKERS = 8
+
+
+def list_partitions(api_get):
+
+    """ Returns a list of the administrative partition names on the LTM """
+
+    partitions = api_get('partition', module='auth')
+
+    return [partition['name'] for partition in partitions.get('items', [])]
+
+
+def fetch_partition(api_get, partition):
+
+    """ Makes the Virtual Server details and LTM Pool stats API calls for a
+        single partition.
+    """
+
+    part_filter = '?$filter=partition%20eq%20' + partition
+
+    ltm_virt = api_get('virtual' + part_filter)
+    ltm_stats = api_get('pool/members/stats' + part_filter)
+
+    return ltm_virt, ltm_stats
+
+
+def merge_shards(shards):
+
+    """ Merges the per partition responses into one Virtual Server details
+        and one LTM Pool stats response, in the form 'create_virt_dict' and
+        'xref_pools' expect.
+    """
+
+    # Intialise variables
+    ltm_virt = {'items': []}
+    ltm_stats = {'entries': {}}
+
+    for shard_virt, shard_stats in shards:
+        ltm_virt['items'].extend(shard_virt.get('items', []))
+        ltm_stats['entries'].update(shard_stats.get('entries', {}))
+
+    return ltm_virt, ltm_stats
+
+
+def collect_by_partition(api_get, max_workers=MAX_WORKERS):
+
+    """ Lists the partitions on the LTM then fetches each partition's Virtual
+        Server details and LTM Pool stats in parallel. Returns the merged
+        Virtual Server details and LTM Pool stats.
+    """
+
+    partitions = list_partitions(api_get)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        shards = list(executor.map(lambda part: fetch_partition(api_get, part),
+                                   partitions))
+
+    return merge_shards(shards)
@@ -0,0 +1,268 @@
+""" Pool references made by iRules and LTM policies, for virtual servers
+    without a default pool.
+
+    A virtual server with no 'pool' may still send traffic to pools chosen by
+    its iRules ('pool <name>' commands) or LTM policies (forward to pool
+    actions). The pools each iRule and policy reference are extracted with
+    precompiled patterns, and the extraction is cached by a checksum of the
+    iRule or policy, so it is only re-run when the iRule or policy changes.
+
+    The cache is a JSON file shared by all devices, as the checksum covers
+    the iRule or policy content and its partition.
+
+    The policies attached to each virtual server are read from the 'policies'
+    list the config cache keeps, so no call is made per virtual server. Only
+    a 'virtual' response which did not come through the config cache falls
+    back to fetching each pool-less virtual server's policies.
+
+    This module expects the following API URLs as follows:
+
+        https://<ip-address>/mgmt/tm/ltm/rule
+        https://<ip-address>/mgmt/tm/ltm/policy?expandSubcollections=true
+        https://<ip-address>/mgmt/tm/ltm/virtual/<virtual>/policies
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+import re
+import json
+import hashlib
+
+
+# Default location of the cache, in the local directory
+CACHE_FILE = 'f5_pool_refs_cache.json'
+
+# iRule comment lines, and the 'pool <name>' command with a literal name.
+# Quoted strings are matched as a whole without a name, so the word 'pool'
+# inside a string, such as a log message, is not taken as a command.
+IRULE_COMMENT = re.compile(r'^\s*#.*$', re.MULTILINE)
+IRULE_POOL = re.compile(r'(?:^|(?<=[\s;{\[]))pool\s+"([\w.\-/]+)"'
+                        r'|(?:^|(?<=[\s;{\[]))pool\s+([\w.\-/]+)'
+                        r'|"(?:[^"\\]|\\.)*"', re.MULTILINE)
+
+# Version of the extraction, part of each checksum so extractions cached by
+# an earlier version are not reused
+EXTRACT_VERSION = '2'
+
+# Cached extractions held in memory, keyed by cache file
+_memory_cache = {}
+
+
+def checksum(partition, content):
+
+    """ Returns the checksum of an iRule or policy in its partition """
+
+    data = EXTRACT_VERSION + '\n' + partition + '\n' + content
+
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def full_pool_name(partition, pool_name):
+
+    """ Returns the full path of a pool name, names without a partition are
+        in the partition of the iRule or policy referencing them.
+    """
+
+    if pool_name.startswith('/'):
+        return pool_name
+
+    return '/' + partition + '/' + pool_name
+
+
+def extract_irule_pools(partition, rule_text):
+
+    """ Returns the sorted list of pools an iRule's 'pool' commands name """
+
+    rule_text = IRULE_COMMENT.sub('', rule_text)
+
+    return sorted({full_pool_name(partition, quoted or bare)
+                   for quoted, bare in IRULE_POOL.findall(rule_text)
+                   if quoted or bare})
+
+
+def extract_policy_pools(partition, policy):
+
+    """ Returns the sorted list of pools a policy's rule actions forward to """
+
+    # Intialise variables
+    pools = set()
+
+    rules = policy.get('rulesReference', {}).get('items', [])
+    for rule in rules:
+        actions = rule.get('actionsReference', {}).get('items', [])
+        for action in actions:
+            if action.get('pool'):
+                pools.add(full_pool_name(partition, action['pool']))
+
+    return sorted(pools)
+
+
+def load_cache(cache_file=CACHE_FILE):
+
+    """ Returns the cached extractions, checksum to list of pools """
+
+    cache = _memory_cache.get(cache_file)
+
+    if cache is None:
+        try:
+            with open(cache_file) as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            cache = {}
+        _memory_cache[cache_file] = cache
+
+    return cache
+
+
+def save_cache(cache, cache_file=CACHE_FILE):
+
+    """ Writes the cached extractions to the cache file. Extractions another
+        process (e.g. a distributed worker) wrote since the cache was loaded
+        are merged in first, and each process writes its own temporary file,
+        so concurrent saves neither collide nor drop each other's entries.
+    """
+
+    try:
+        with open(cache_file) as file:
+            cache = {**json.load(file), **cache}
+    except (OSError, ValueError):
+        pass
+    _memory_cache[cache_file] = cache
+
+    tmp_filename = cache_file + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp_filename, 'w') as file:
+        json.dump(cache, file)
+    os.replace(tmp_filename, cache_file)
+
+
+def cached_pools(cache, partition, content, extract):
+
+    """ Returns the pools referenced by an iRule or policy, from the cache if
+        its checksum is unchanged, otherwise by running 'extract()'. Returns
+        a tuple of the pools and whether the cache was updated.
+    """
+
+    key = checksum(partition, content)
+    pools = cache.get(key)
+    if pools is not None:
+        return pools, False
+
+    pools = extract()
+    cache[key] = pools
+
+    return pools, True
+
+
+def poolless_virtuals(ltm_virt):
+
+    """ Returns the virtual servers in the 'virtual' response without a
+        default pool.
+    """
+
+    return [virt for virt in ltm_virt.get('items', []) if 'pool' not in virt]
+
+
+def get_pool_refs(api_get, ltm_virt, cache_file=CACHE_FILE):
+
+    """ Returns a dictionary of virtual server name to the sorted list of
+        pools its iRules and policies reference, for the virtual servers
+        without a default pool. Virtual servers which reference no pools are
+        left out.
+    """
+
+    # Intialise variables
+    pool_refs = {}
+    changed = False
+
+    virts = poolless_virtuals(ltm_virt)
+    if not virts:
+        return pool_refs
+
+    cache = load_cache(cache_file)
+    rules = {rule['fullPath']: rule
+             for rule in api_get('rule').get('items', [])}
+    policies = None
+
+    for virt in virts:
+        pools = set()
+
+        # iRules, the virtual server lists them by full path
+        for rule_name in virt.get('rules', []):
+            rule = rules.get(rule_name)
+            if rule is None:
+                continue
+            partition = rule.get('partition', 'Common')
+            rule_text = rule.get('apiAnonymous', '')
+            rule_pools, updated = cached_pools(
+                cache, partition, rule_text,
+                lambda: extract_irule_pools(partition, rule_text))
+            pools.update(rule_pools)
+            changed = changed or updated
+
+        # Policies, from the config cache or else fetched for the virtual
+        policy_names = virt.get('policies')
+        if policy_names is None:
+            virt_ref = virt.get('fullPath', virt['name']).replace('/', '~')
+            policy_names = [virt_policy.get('fullPath') for virt_policy in
+                            api_get('virtual/' + virt_ref + '/policies')
+                            .get('items', [])]
+
+        # The policies themselves are fetched once, and only when needed
+        for policy_name in policy_names:
+            if policies is None:
+                policies = {policy['fullPath']: policy for policy in
+                            api_get('policy?expandSubcollections=true')
+                            .get('items', [])}
+            policy = policies.get(policy_name)
+            if policy is None:
+                continue
+            partition = policy.get('partition', 'Common')
+            content = json.dumps(policy.get('rulesReference', {}),
+                                 sort_keys=True)
+            policy_pools, updated = cached_pools(
+                cache, partition, content,
+                lambda: extract_policy_pools(partition, policy))
+            pools.update(policy_pools)
+            changed = changed or updated
+
+        if pools:
+            pool_refs[virt['name']] = sorted(pools)
+
+    if changed:
+        save_cache(cache, cache_file)
+
+    return pool_refs
+
+
+def add_pool_stats(api_get, ltm_stats, pool_refs):
+
+    """ Returns the LTM Pool stats with the stats of any referenced pools it
+        is missing added, for when only the selected virtual servers' pools
+        were fetched. The passed stats are not modified. A referenced pool
+        which cannot be fetched, such as one since deleted or a name built
+        at runtime, is skipped rather than ending the collection.
+    """
+
+    import requests
+    from .client import raise_request_errors
+    from .selection import POOL_REF_PREFIX, fetch_pool_mem_stats
+
+    entries = dict(ltm_stats.get('entries', {}))
+
+    for pools in pool_refs.values():
+        for pool_name in pools:
+            pool_ref = pool_name.replace('/', '~')
+            if POOL_REF_PREFIX + pool_ref + '/stats' in entries:
+                continue
+            try:
+                with raise_request_errors():
+                    pool_ref_stats, entry = fetch_pool_mem_stats(api_get,
+                                                                 pool_name)
+            except requests.exceptions.RequestException:
+                continue
+            entries[pool_ref_stats] = entry
+
+    return {'entries': entries}
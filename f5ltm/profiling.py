@@ -0,0 +1,273 @@
+""" Profiling of any run of the tools, without editing the code.
+
+    Each entry point script accepts:
+
+        --profile               profile with cProfile
+        --profile=sample        profile with the low overhead sampler
+        --profile-phase=NAME    only profile the named phase, see 'PHASES'
+        --profile-out=PREFIX    file name prefix of the profile output
+
+    cProfile writes '<prefix>.pstats', for 'pstats' or snakeviz, and
+    '<prefix>.collapsed', collapsed stacks ready for flamegraph.pl or
+    speedscope. The collapsed stacks are rebuilt from cProfile's caller graph,
+    so time is split between the stacks in proportion to the calls. The
+    sampler records the real stacks of the main thread every
+    'SAMPLE_INTERVAL' seconds and writes '<prefix>.collapsed' only.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+import sys
+import time
+import threading
+import importlib
+
+
+# Phases that can be profiled on their own, name to (module, function)s
+PHASES = {'collect': [('engine', 'collect')],
+          'xref_pools': [('engine', 'xref_pools')],
+          'writers': [('engine', 'write_virt_csv'),
+                      ('engine', 'write_poolmem_csv'),
+                      ('reports', 'write_all_reports')],
+          'snapshot': [('snapshot', 'write_snapshot')],
+          'indexes': [('dormancy', 'update_index'),
+                      ('member_index', 'update_member_index')]
+          }
+
+# Seconds between samples taken by the sampler
+SAMPLE_INTERVAL = 0.005
+
+# Stacks given less time than this, in seconds, are left out of the
+# collapsed stacks rebuilt from cProfile
+MIN_STACK_TIME = 0.000001
+
+
+def parse_profile_args(argv):
+
+    """ Returns the profile options from the command line arguments as a
+        dictionary of 'mode' (None, 'cprofile' or 'sample'), 'phase' and
+        'out'.
+    """
+
+    # Intialise variables
+    options = {'mode': None, 'phase': None, 'out': None}
+
+    for arg in argv:
+        name, _, value = arg.partition('=')
+        if name == '--profile':
+            options['mode'] = 'sample' if value == 'sample' else 'cprofile'
+        elif name == '--profile-phase':
+            if value not in PHASES:
+                raise SystemExit('Unknown profile phase {!r}, choose from {}'
+                                 .format(value, ', '.join(PHASES)))
+            options['phase'] = value
+        elif name == '--profile-out':
+            options['out'] = value
+
+    if options['out'] is None:
+        options['out'] = ('f5_profile_'
+                          + time.strftime('%d-%m-%y_%H%M%S'))
+
+    return options
+
+
+def frame_label(name, filename, lineno):
+
+    """ Returns the collapsed stack label of a function """
+
+    if filename == '~':
+        return name.replace(';', ':')
+
+    return '{} ({}:{})'.format(name, os.path.basename(filename), lineno)
+
+
+def install_phase(phase, start, stop):
+
+    """ Wraps the functions of the phase so 'start()' is called on entering
+        the phase and 'stop()' on leaving it. Returns a function that removes
+        the wrappers.
+    """
+
+    # Intialise variables
+    depth = [0]
+    originals = []
+
+    def wrap(func):
+        def phase_func(*args, **kwargs):
+            if depth[0] == 0:
+                start()
+            depth[0] += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                depth[0] -= 1
+                if depth[0] == 0:
+                    stop()
+        return phase_func
+
+    for module_name, func_name in PHASES[phase]:
+        func = getattr(importlib.import_module('f5ltm.' + module_name),
+                       func_name)
+        phase_func = wrap(func)
+
+        # Also replace the function where it was imported by name
+        for name, module in list(sys.modules.items()):
+            if name.startswith('f5ltm') \
+                    and getattr(module, func_name, None) is func:
+                originals.append((module, func_name, func))
+                setattr(module, func_name, phase_func)
+
+    def uninstall():
+        for module, func_name, func in originals:
+            setattr(module, func_name, func)
+
+    return uninstall
+
+
+def collapse_pstats(stats):
+
+    """ Rebuilds collapsed stacks from the 'stats' of a 'pstats.Stats',
+        returning a dictionary of stack to seconds. Each function's time is
+        split between its callers in proportion to the time of each call.
+    """
+
+    # Intialise variables
+    callees = {}
+    stacks = {}
+
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+
+    def walk(func, stack, seen, budget):
+        cc, nc, tt, ct, callers = stats[func]
+        if ct <= 0 or budget < MIN_STACK_TIME:
+            return
+        share = budget / ct
+        label = ';'.join(stack)
+        stacks[label] = stacks.get(label, 0) + tt * share
+        for callee, edge_ct in callees.get(func, {}).items():
+            if callee in seen:
+                continue
+            walk(callee, stack + [frame_label(callee[2], *callee[:2])],
+                 seen | {callee}, edge_ct * share)
+
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        if not callers:
+            walk(func, [frame_label(func[2], *func[:2])], {func}, ct)
+
+    return stacks
+
+
+def write_collapsed(stacks, filename):
+
+    """ Writes collapsed stacks, stack to seconds, to the named file with the
+        time in microseconds.
+    """
+
+    with open(filename, 'w') as file:
+        for stack, seconds in sorted(stacks.items()):
+            micros = int(round(seconds * 1000000))
+            if micros > 0:
+                file.write('{} {}\n'.format(stack, micros))
+
+
+def profile_cprofile(func, args, phase, out):
+
+    """ Runs 'func(*args)' under cProfile and writes the pstats and collapsed
+        stacks. Returns the files written and the result of the call.
+    """
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    uninstall = None
+
+    try:
+        if phase is None:
+            result = profiler.runcall(func, *args)
+        else:
+            uninstall = install_phase(phase, profiler.enable,
+                                      profiler.disable)
+            result = func(*args)
+    finally:
+        if uninstall is not None:
+            uninstall()
+        profiler.dump_stats(out + '.pstats')
+        write_collapsed(collapse_pstats(profiler.stats), out + '.collapsed')
+
+    return [out + '.pstats', out + '.collapsed'], result
+
+
+def profile_sample(func, args, phase, out, interval=SAMPLE_INTERVAL):
+
+    """ Runs 'func(*args)' while sampling the main thread's stack every
+        'interval' seconds and writes the collapsed stacks. Returns the files
+        written and the result of the call.
+    """
+
+    # Intialise variables
+    target = threading.get_ident()
+    sampling = threading.Event()
+    done = threading.Event()
+    samples = {}
+
+    def sampler():
+        while not done.wait(interval):
+            if not sampling.is_set():
+                continue
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(frame_label(code.co_name, code.co_filename,
+                                         code.co_firstlineno))
+                frame = frame.f_back
+            label = ';'.join(reversed(stack))
+            samples[label] = samples.get(label, 0) + interval
+
+    thread = threading.Thread(target=sampler, daemon=True)
+    uninstall = None
+    if phase is None:
+        sampling.set()
+    else:
+        uninstall = install_phase(phase, sampling.set, sampling.clear)
+
+    thread.start()
+    try:
+        result = func(*args)
+    finally:
+        done.set()
+        thread.join()
+        if uninstall is not None:
+            uninstall()
+        write_collapsed(samples, out + '.collapsed')
+
+    return [out + '.collapsed'], result
+
+
+def profile_main(func, *args, argv=None):
+
+    """ Runs 'func(*args)', profiled if the command line asks for it (see the
+        module docstring). Returns the result of the call.
+    """
+
+    options = parse_profile_args(sys.argv[1:] if argv is None else argv)
+
+    if options['mode'] is None:
+        return func(*args)
+
+    if options['mode'] == 'sample':
+        filenames, result = profile_sample(func, args, options['phase'],
+                                           options['out'])
+    else:
+        filenames, result = profile_cprofile(func, args, options['phase'],
+                                             options['out'])
+
+    for profile_file in filenames:
+        print('The profile has been written to', profile_file)
+
+    return result
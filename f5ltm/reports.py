@@ -0,0 +1,148 @@
+""" Writes all the reports, the active virtual servers, the inactive virtual
+    servers and the pool member stats, in a single pass over the virtual
+    server dictionary.
+
+    Each report is written through a sink which can compress the output with
+    gzip, or zstd when the 'zstandard' package is installed, and is written
+    to a temporary file that is only renamed into place once it is complete.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+from contextlib import contextmanager
+from .engine import (VIRT_CSV_HEADER, POOLMEM_CSV_HEADER, virt_csv_line,
+                     poolmem_csv_lines)
+
+
+# File extension added for each compression
+COMPRESSIONS = {'': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def open_stream(filename, compression=''):
+
+    """ Opens a text stream for writing to the file, compressed with the
+        named compression.
+    """
+
+    if compression == 'gzip':
+        import gzip
+        return gzip.open(filename, 'wt')
+
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit('zstd compression needs the zstandard package, '
+                             'pip install zstandard')
+        import io
+        raw = open(filename, 'wb')
+        writer = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(writer)
+
+    return open(filename, 'w')
+
+
+@contextmanager
+def atomic_sink(filename, compression=''):
+
+    """ Opens a sink to write a report to. The report is written to a
+        temporary file which is renamed to 'filename', with the compression
+        extension added, once it has been written. Returns the final file
+        name through the sink's 'name' attribute.
+    """
+
+    filename = filename + COMPRESSIONS[compression]
+    tmp_filename = filename + '.tmp'
+
+    stream = open_stream(tmp_filename, compression)
+    try:
+        yield stream
+    except BaseException:
+        stream.close()
+        os.remove(tmp_filename)
+        raise
+
+    stream.close()
+    os.replace(tmp_filename, filename)
+
+
+def write_all_reports(virt_dict, virt_act_dict, filename, dt_str,
+                      compression='', rollups=None):
+
+    """ Writes the active and inactive virtual servers and the pool member
+        stats to three .csv files in one pass over 'virt_dict'. Virtual
+        servers in 'virt_act_dict' are written as active, the rest as
+        inactive. If rollups are passed the pool, partition and device totals
+        are written to a fourth file. Returns the names of the files written.
+    """
+
+    # Intialise variables
+    filenames = {}
+    reports = ['active', 'inactive', 'members']
+
+    with atomic_sink(filename + '_active_' + dt_str + '.csv',
+                     compression) as act_file, \
+         atomic_sink(filename + '_inactive_' + dt_str + '.csv',
+                     compression) as inact_file, \
+         atomic_sink(filename + '_members_' + dt_str + '.csv',
+                     compression) as mem_file:
+
+        # Write headers
+        act_file.writelines(VIRT_CSV_HEADER)
+        inact_file.writelines(VIRT_CSV_HEADER)
+        mem_file.writelines(POOLMEM_CSV_HEADER)
+
+        # One pass over the virtual servers, writing to every report
+        for virt, params in virt_dict.items():
+            if virt in virt_act_dict:
+                act_file.writelines(virt_csv_line(virt, params))
+            else:
+                inact_file.writelines(virt_csv_line(virt, params))
+            for line in poolmem_csv_lines(params):
+                mem_file.writelines(line)
+
+    # The totals are already rolled up, so need no pass over the data
+    if rollups is not None:
+        from .rollups import write_rollups
+        with atomic_sink(filename + '_totals_' + dt_str + '.csv',
+                         compression) as totals_file:
+            write_rollups(rollups, totals_file)
+        reports.append('totals')
+
+    for report in reports:
+        filenames[report] = (filename + '_' + report + '_' + dt_str + '.csv'
+                             + COMPRESSIONS[compression])
+
+    return filenames
+
+
+def write_all_reports_menu(virt_dict, virt_act_dict, rollups=None):
+
+    """ Ask the user for the filename and compression, then write all the
+        reports in one pass.
+    """
+
+    from .engine import get_filename
+
+    message = ('\n\nPlease enter the name of the file you wish to save '
+               'without the file extension,\nthe report name and the date '
+               'and time will be suffixed to the filename: ')
+    filename, dt_str = get_filename(message)
+
+    compression = input('\nCompress the files? (enter for none, gzip or '
+                        'zstd): ').lower()
+    while compression not in COMPRESSIONS:
+        compression = input('Please enter gzip, zstd or press enter for '
+                            'none: ').lower()
+    os.system('cls')
+
+    filenames = write_all_reports(virt_dict, virt_act_dict, filename, dt_str,
+                                  compression, rollups)
+
+    for report_file in filenames.values():
+        print('\nThe file has been written to timestamped ', report_file,
+              ' in the local directory', sep = '')
+    input('\nPress enter to return to options menu.')
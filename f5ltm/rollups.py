@@ -0,0 +1,121 @@
+""" Rollups of the pool member stats per pool, per partition and per device,
+    computed by 'xref_pools' in the same pass that builds the member records.
+
+    The rollups keep the last stats of each member, so when the same rollups
+    are passed to repeated collections (daemon or sampling runs) only the
+    change in each member's counters is applied, rather than recomputing the
+    totals from scratch. A member that is no longer present has its last
+    stats taken back off the totals.
+
+    A pool used by several virtual servers is only counted once per pass.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+from .engine import STAT_NAMES
+
+
+# Member stats rolled up, maximum connections is not additive so is left out
+ROLLUP_STATS = [stat for stat in STAT_NAMES if stat != 'serverside_maxconns']
+
+ROLLUP_CSV_HEADER = ['Level', 'Name'] + ROLLUP_STATS
+
+
+def new_rollups(device):
+
+    """ Returns empty rollups for the device """
+
+    rollups = {'device': device,
+               'pass': 0,
+               'members': {},
+               'pool': {},
+               'partition': {},
+               'totals': dict.fromkeys(ROLLUP_STATS, 0)
+               }
+
+    return rollups
+
+
+def start_pass(rollups):
+
+    """ Starts a new collection pass over the member stats """
+
+    rollups['pass'] += 1
+
+
+def apply_delta(rollups, pool_name, delta):
+
+    """ Adds the delta to the pool, partition and device totals """
+
+    partition = pool_name.split('/')[1] if '/' in pool_name else ''
+    pool_totals = rollups['pool'].setdefault(pool_name,
+                                             dict.fromkeys(ROLLUP_STATS, 0))
+    part_totals = rollups['partition'].setdefault(
+        partition, dict.fromkeys(ROLLUP_STATS, 0))
+
+    for stat, value in delta.items():
+        pool_totals[stat] += value
+        part_totals[stat] += value
+        rollups['totals'][stat] += value
+
+
+def add_member(rollups, pool_name, mem_id, stats):
+
+    """ Adds a pool member's stats to the rollups. Only the change since the
+        member was last added is applied, and a member already added in this
+        pass (its pool is used by another virtual server) is skipped.
+    """
+
+    key = (pool_name, mem_id)
+    last = rollups['members'].get(key)
+
+    if last is not None and last[0] == rollups['pass']:
+        return
+
+    new = {stat: stats.get(stat, 0) for stat in ROLLUP_STATS}
+    if last is None:
+        delta = new
+    else:
+        delta = {stat: new[stat] - last[1][stat] for stat in ROLLUP_STATS}
+
+    rollups['members'][key] = (rollups['pass'], new)
+    apply_delta(rollups, pool_name, delta)
+
+
+def end_pass(rollups):
+
+    """ Ends a collection pass, taking the last stats of any member not seen
+        in the pass back off the totals.
+    """
+
+    gone = [key for key, (mem_pass, stats) in rollups['members'].items()
+            if mem_pass != rollups['pass']]
+
+    for key in gone:
+        mem_pass, stats = rollups['members'].pop(key)
+        apply_delta(rollups, key[0], {stat: -value
+                                      for stat, value in stats.items()})
+
+
+def rollup_rows(rollups):
+
+    """ Yields each rollup as a list of level, name and the totals """
+
+    for pool_name, totals in sorted(rollups['pool'].items()):
+        yield ['pool', pool_name] + [totals[stat] for stat in ROLLUP_STATS]
+    for partition, totals in sorted(rollups['partition'].items()):
+        yield ['partition', partition] + [totals[stat]
+                                          for stat in ROLLUP_STATS]
+    yield ['device', rollups['device']] + [rollups['totals'][stat]
+                                           for stat in ROLLUP_STATS]
+
+
+def write_rollups(rollups, file):
+
+    """ Write the rollups as .csv lines to an open file or sink """
+
+    file.write(','.join(ROLLUP_CSV_HEADER) + '\n')
+    for row in rollup_rows(rollups):
+        file.write(','.join(str(value) for value in row) + '\n')
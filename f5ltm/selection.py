@@ -0,0 +1,129 @@
+""" Collects the LTM Pool stats for only the pools referenced by a selected
+    subset of Virtual Servers, e.g. one partition or a name pattern.
+
+    The Virtual Server details are fetched first and the referenced pools
+    resolved from them. Depending on how many pools are needed compared to the
+    total on the LTM, the stats are either fetched per pool with concurrent
+    API calls or with the single bulk API call.
+
+    This module expects the following API URLs as follows:
+
+        https://<ip-address>/mgmt/tm/ltm/virtual
+        https://<ip-address>/mgmt/tm/ltm/pool?$select=fullPath
+        https://<ip-address>/mgmt/tm/ltm/pool/~<partition>~<pool>/members/stats
+        https://<ip-address>/mgmt/tm/ltm/pool/members/stats
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+from fnmatch import fnmatchcase
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Use per pool API calls while no more than this fraction of the pools, and
+# no more than this number of pools, are needed. Otherwise the bulk call is
+# cheaper than the per request overhead.
+TARGETED_RATIO = 0.25
+TARGETED_MAX_POOLS = 200
+
+# Number of per pool API calls to make at the same time
+MAX_WORKERS = 8
+
+# Prefix of the pool entries in the bulk 'pool/members/stats' response
+POOL_REF_PREFIX = 'https://localhost/mgmt/tm/ltm/pool/members/'
+
+
+def select_virtuals(ltm_virt, partition='', pattern=''):
+
+    """ Returns the Virtual Server details response with only the virtual
+        servers in 'partition' whose name matches the shell style 'pattern'.
+        An empty 'partition' or 'pattern' matches everything.
+    """
+
+    selected = [virt for virt in ltm_virt.get('items', [])
+                if (not partition or virt.get('partition') == partition)
+                and (not pattern or fnmatchcase(virt['name'], pattern))]
+
+    return {'items': selected}
+
+
+def referenced_pools(ltm_virt):
+
+    """ Returns the set of pool full paths the virtual servers reference """
+
+    return {virt['pool'] for virt in ltm_virt.get('items', [])
+            if 'pool' in virt}
+
+
+def count_pools(api_get):
+
+    """ Returns the total number of pools on the LTM """
+
+    pools = api_get('pool?$select=fullPath')
+
+    return len(pools.get('items', []))
+
+
+def use_targeted(needed, total):
+
+    """ Decides whether per pool API calls are cheaper than the bulk call """
+
+    return (needed <= TARGETED_MAX_POOLS
+            and needed <= total * TARGETED_RATIO)
+
+
+def fetch_pool_mem_stats(api_get, pool_name):
+
+    """ Fetches the member stats of a single pool and wraps them in the same
+        form as that pool's entry in the bulk 'pool/members/stats' response.
+    """
+
+    pool_ref = pool_name.replace('/', '~')
+    pool_mems = api_get('pool/' + pool_ref + '/members/stats')
+
+    pool_ref_stats = POOL_REF_PREFIX + pool_ref + '/stats'
+    pool_ref_mems = POOL_REF_PREFIX + pool_ref + '/members/stats'
+
+    entry = {'nestedStats': {'entries': {pool_ref_mems: {
+        'nestedStats': {'entries': pool_mems.get('entries', {})}}}}}
+
+    return pool_ref_stats, entry
+
+
+def fetch_selected_stats(api_get, pools, total_pools, max_workers=MAX_WORKERS):
+
+    """ Fetches the LTM Pool stats for the passed pools, using concurrent per
+        pool API calls when few pools are needed and the bulk API call
+        otherwise. Returns the stats in the bulk 'pool/members/stats' form.
+    """
+
+    if not use_targeted(len(pools), total_pools):
+        return api_get('pool/members/stats')
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        entries = dict(executor.map(lambda pool: fetch_pool_mem_stats(api_get,
+                                                                      pool),
+                                    sorted(pools)))
+
+    return {'entries': entries}
+
+
+def collect_selected(api_get, partition='', pattern=''):
+
+    """ Fetches the Virtual Server details, selects the virtual servers by
+        partition and name pattern, then fetches the stats for only the pools
+        they reference. Returns the selected Virtual Server details and the
+        LTM Pool stats.
+    """
+
+    ltm_virt = select_virtuals(api_get('virtual'), partition, pattern)
+    pools = referenced_pools(ltm_virt)
+
+    if not pools:
+        return ltm_virt, {'entries': {}}
+
+    ltm_stats = fetch_selected_stats(api_get, pools, count_pools(api_get))
+
+    return ltm_virt, ltm_stats
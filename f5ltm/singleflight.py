@@ -0,0 +1,85 @@
+""" Single flight coalescing of identical concurrent F5 API calls.
+
+    When several callers ask for the same device endpoint at the same time,
+    only the first makes the API call and the others wait for and share its
+    decoded result. The result is also reused for a short freshness window
+    to absorb bursts of identical calls.
+
+    Results are shared between callers, so they must not be modified.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import time
+import threading
+from concurrent.futures import Future
+from urllib.parse import parse_qsl, urlencode
+
+
+# Seconds a result is reused for after the call completes
+FRESH_FOR = 2.0
+
+# Calls in flight, and recently completed calls with their completion time
+_inflight = {}
+_recent = {}
+_lock = threading.Lock()
+
+
+def flight_key(device, module, uri_ext):
+
+    """ Returns the key identifying an API call, with the query parameters
+        sorted so the same call always has the same key.
+    """
+
+    path, _, query = uri_ext.partition('?')
+    query = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+
+    return (device, module, path, query)
+
+
+def single_flight(key, fetch, fresh_for=FRESH_FOR):
+
+    """ Returns the result of 'fetch()' for the key. If a call for the key is
+        already in flight its result is waited for and shared, and a result
+        completed less than 'fresh_for' seconds ago is reused.
+    """
+
+    with _lock:
+        now = time.monotonic()
+        recent = _recent.get(key)
+        if recent is not None and now - recent[0] < fresh_for:
+            return recent[1]
+
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+
+    # Another caller is making this call, wait for its result
+    if not leader:
+        return future.result()
+
+    try:
+        result = fetch()
+    except BaseException as err:
+        with _lock:
+            del _inflight[key]
+        future.set_exception(err)
+        raise
+
+    with _lock:
+        del _inflight[key]
+        now = time.monotonic()
+        _recent[key] = (now, result)
+
+        # Drop results that are no longer fresh
+        for stale_key in [stale_key for stale_key, (done, _) in _recent.items()
+                          if now - done >= fresh_for]:
+            del _recent[stale_key]
+
+    future.set_result(result)
+
+    return result
@@ -0,0 +1,506 @@
+""" Compact binary snapshot of the F5 LTM Virtual Server and Pool Member
+    stats, written after 'xref_pools' for a run that collected every
+    virtual server with its pool member stats. Reporting reads it with 'mmap' and
+    only touches the records it needs, rather than parsing the whole
+    snapshot.
+
+    File layout, all little endian:
+
+        header   - magic, version, record counts and section offsets
+        strings  - (offset, length) per string, then the UTF-8 string data
+        members  - per pool member: name id, pool id, 7 x 64 bit counters
+        pools    - per pool, sorted by name: name id, first member, count
+        virtuals - per virtual server, sorted by name: name id, destination
+                   id, description id, pool index, first and count of its
+                   referenced pools, active flag
+        refs     - pool index of each pool referenced by the iRules and
+                   policies of virtual servers without a default pool
+
+    Members are stored once per pool, so virtual servers sharing a pool share
+    its member records. Virtual servers and pools are found by binary search
+    on their sorted index.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+import mmap
+import struct
+from collections.abc import Mapping
+from .engine import STAT_NAMES, virt_pools
+
+
+MAGIC = b'F5SNAP'
+VERSION = 2
+
+# Directory the snapshots are written to, one file per device
+SNAPSHOT_DIR = 'f5_snapshots'
+
+HEADER = struct.Struct('<6sHIIIIIQQQQQQ')
+STRING = struct.Struct('<II')
+MEMBER = struct.Struct('<II7Q')
+POOL = struct.Struct('<III')
+VIRTUAL = struct.Struct('<IIIIIII')
+REF = struct.Struct('<I')
+
+# Pool index stored for virtual servers without a pool
+NO_POOL = 0xFFFFFFFF
+
+
+def snapshot_filename(device, snapshot_dir=SNAPSHOT_DIR):
+
+    """ Returns the name of the snapshot file for the device """
+
+    return os.path.join(snapshot_dir, device.replace(':', '_') + '.f5s')
+
+
+def write_snapshot(filename, virt_act_dict, virt_inact_dict):
+
+    """ Writes the active and inactive virtual server dictionaries returned
+        by 'xref_pools' to a binary snapshot. The file is written to a
+        temporary name and renamed into place.
+    """
+
+    # Intialise variables
+    strings = {}
+    pools = {}
+
+    def intern(value):
+        return strings.setdefault(value, len(strings))
+
+    # Collect each pool's members once, from the first virtual using it
+    virt_list = ([(virt, values, 1) for virt, values in virt_act_dict.items()]
+                 + [(virt, values, 0)
+                    for virt, values in virt_inact_dict.items()])
+    for virt, values, active in virt_list:
+        for pool_name, pool_mems in virt_pools(values):
+            if pool_name not in pools:
+                pools[pool_name] = [(mem_id, stats) for mem in pool_mems
+                                    for mem_id, stats in mem.items()
+                                    if mem_id]
+
+    # Members, grouped by pool in pool name order
+    pool_names = sorted(pools)
+    pool_index = {}
+    member_recs = []
+    pool_recs = []
+    for pool_name in pool_names:
+        pool_id = intern(pool_name)
+        pool_index[pool_name] = len(pool_recs)
+        pool_recs.append(POOL.pack(pool_id, len(member_recs),
+                                   len(pools[pool_name])))
+        for mem_id, stats in pools[pool_name]:
+            member_recs.append(MEMBER.pack(intern(mem_id), pool_id,
+                                           *[stats.get(stat, 0)
+                                             for stat in STAT_NAMES]))
+
+    # Virtual servers in name order, with their referenced pools
+    virt_recs = []
+    ref_recs = []
+    for virt, values, active in sorted(virt_list, key=lambda item: item[0]):
+        pool_name = values['virt_pool']['pool_name']
+        ref_pools = values['virt_pool'].get('ref_pools', [])
+        virt_recs.append(VIRTUAL.pack(intern(virt),
+                                      intern(values['virt_dest']),
+                                      intern(values['virt_desc']),
+                                      pool_index.get(pool_name, NO_POOL),
+                                      len(ref_recs), len(ref_pools), active))
+        for ref_pool in ref_pools:
+            ref_recs.append(REF.pack(pool_index[ref_pool['pool_name']]))
+
+    # String table
+    string_data = [value.encode() for value in strings]
+    string_recs = []
+    offset = 0
+    for data in string_data:
+        string_recs.append(STRING.pack(offset, len(data)))
+        offset += len(data)
+
+    # Work out the section offsets
+    strings_off = HEADER.size
+    string_data_off = strings_off + STRING.size * len(string_recs)
+    members_off = string_data_off + offset
+    pools_off = members_off + MEMBER.size * len(member_recs)
+    virts_off = pools_off + POOL.size * len(pool_recs)
+    refs_off = virts_off + VIRTUAL.size * len(virt_recs)
+
+    header = HEADER.pack(MAGIC, VERSION, len(string_recs), len(member_recs),
+                         len(pool_recs), len(virt_recs), len(ref_recs),
+                         strings_off, string_data_off, members_off, pools_off,
+                         virts_off, refs_off)
+
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'wb') as file:
+        file.write(header)
+        file.writelines(string_recs)
+        file.writelines(string_data)
+        file.writelines(member_recs)
+        file.writelines(pool_recs)
+        file.writelines(virt_recs)
+        file.writelines(ref_recs)
+    os.replace(tmp_filename, filename)
+
+
+def open_snapshot(filename):
+
+    """ Memory maps a snapshot and returns it as a dictionary of the map and
+        its header fields.
+    """
+
+    with open(filename, 'rb') as file:
+        snap_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    (magic, version, n_strings, n_members, n_pools, n_virts, n_refs,
+     strings_off, string_data_off, members_off, pools_off, virts_off,
+     refs_off) = HEADER.unpack_from(snap_map, 0)
+
+    if magic != MAGIC or version != VERSION:
+        snap_map.close()
+        raise ValueError('{} is not a version {} F5 snapshot'
+                         .format(filename, VERSION))
+
+    snap = {'map': snap_map,
+            'n_strings': n_strings,
+            'n_members': n_members,
+            'n_pools': n_pools,
+            'n_virts': n_virts,
+            'n_refs': n_refs,
+            'strings_off': strings_off,
+            'string_data_off': string_data_off,
+            'members_off': members_off,
+            'pools_off': pools_off,
+            'virts_off': virts_off,
+            'refs_off': refs_off
+            }
+
+    return snap
+
+
+def close_snapshot(snap):
+
+    """ Closes a snapshot opened with 'open_snapshot' """
+
+    snap['map'].close()
+
+
+def read_string(snap, string_id):
+
+    """ Returns a string from the snapshot's string table """
+
+    offset, length = STRING.unpack_from(snap['map'], snap['strings_off']
+                                        + STRING.size * string_id)
+    start = snap['string_data_off'] + offset
+
+    return snap['map'][start:start + length].decode()
+
+
+def read_virtual(snap, index):
+
+    """ Returns the virtual server record at the index as a tuple of name id,
+        destination id, description id, pool index, first referenced pool,
+        referenced pool count and active flag.
+    """
+
+    return VIRTUAL.unpack_from(snap['map'], snap['virts_off']
+                               + VIRTUAL.size * index)
+
+
+def read_pool(snap, index):
+
+    """ Returns the pool record at the index as a tuple of name id, first
+        member and member count.
+    """
+
+    return POOL.unpack_from(snap['map'], snap['pools_off'] + POOL.size * index)
+
+
+def read_members(snap, first, count):
+
+    """ Returns the pool members from 'first' for 'count' records, as a list
+        of {member id: stats} dictionaries like 'xref_pools' builds.
+    """
+
+    # Intialise variables
+    pool_mems = []
+
+    for index in range(first, first + count):
+        mem_rec = MEMBER.unpack_from(snap['map'], snap['members_off']
+                                     + MEMBER.size * index)
+        pool_mems.append({read_string(snap, mem_rec[0]):
+                          dict(zip(STAT_NAMES, mem_rec[2:]))})
+
+    return pool_mems
+
+
+def find_record(snap, name, count, read_record):
+
+    """ Binary searches a name sorted index and returns the index of the
+        record with the name, or None.
+    """
+
+    low, high = 0, count
+    while low < high:
+        mid = (low + high) // 2
+        mid_name = read_string(snap, read_record(snap, mid)[0])
+        if mid_name < name:
+            low = mid + 1
+        elif mid_name > name:
+            high = mid
+        else:
+            return mid
+
+    return None
+
+
+def virt_entry(snap, index):
+
+    """ Returns the virtual server at the index in the same form as a
+        'virt_dict' entry, with its pool members.
+    """
+
+    (name_id, dest_id, desc_id, pool_index, ref_first, ref_count,
+     active) = read_virtual(snap, index)
+
+    # Intialise variables
+    virt_pool = {'pool_name': 'NO POOL CONFIGURED', 'pool_mems': []}
+
+    if pool_index != NO_POOL:
+        pool_id, first, count = read_pool(snap, pool_index)
+        virt_pool['pool_name'] = read_string(snap, pool_id)
+        virt_pool['pool_mems'] = read_members(snap, first, count)
+    elif ref_count:
+        virt_pool['ref_pools'] = []
+        for ref_index in range(ref_first, ref_first + ref_count):
+            pool_id, first, count = read_pool(snap, REF.unpack_from(
+                snap['map'], snap['refs_off'] + REF.size * ref_index)[0])
+            pool_mems = read_members(snap, first, count)
+            virt_pool['ref_pools'].append({'pool_name': read_string(snap,
+                                                                    pool_id),
+                                           'pool_mems': pool_mems})
+            virt_pool['pool_mems'].extend(pool_mems)
+
+    return {'virt_desc': read_string(snap, desc_id),
+            'virt_dest': read_string(snap, dest_id),
+            'virt_pool': virt_pool,
+            'virt_active': bool(active)
+            }
+
+
+def snapshot_pool_members(snap, pool_name):
+
+    """ Returns the pool members of the named pool, or None if the pool is
+        not in the snapshot.
+    """
+
+    index = find_record(snap, pool_name, snap['n_pools'], read_pool)
+    if index is None:
+        return None
+
+    pool_id, first, count = read_pool(snap, index)
+
+    return read_members(snap, first, count)
+
+
+def iter_snapshot_members(snap):
+
+    """ Yields each pool member in the snapshot as a tuple of pool name,
+        member id and stats dictionary.
+    """
+
+    for index in range(snap['n_members']):
+        mem_rec = MEMBER.unpack_from(snap['map'], snap['members_off']
+                                     + MEMBER.size * index)
+        yield (read_string(snap, mem_rec[1]), read_string(snap, mem_rec[0]),
+               dict(zip(STAT_NAMES, mem_rec[2:])))
+
+
+class SnapshotVirts(Mapping):
+
+    """ Read only, 'virt_dict' like view of the virtual servers in a
+        snapshot, so the existing writers and 'print_poolmem_stats' can run
+        from it. Each lookup only reads the records for that virtual server.
+        'active' limits the view to active (True) or inactive (False) virtual
+        servers.
+    """
+
+    def __init__(self, snap, active=None):
+        self.snap = snap
+        self.active = active
+
+    def __getitem__(self, virt):
+        index = find_record(self.snap, virt, self.snap['n_virts'],
+                            read_virtual)
+        if index is None or not self._selected(index):
+            raise KeyError(virt)
+        return virt_entry(self.snap, index)
+
+    def __iter__(self):
+        for index in range(self.snap['n_virts']):
+            if self._selected(index):
+                yield read_string(self.snap, read_virtual(self.snap, index)[0])
+
+    def __len__(self):
+        return sum(1 for virt in self)
+
+    def _selected(self, index):
+        return (self.active is None
+                or bool(read_virtual(self.snap, index)[6]) == self.active)
+
+
+def export_poolmem_csv(snapshot_file, filename):
+
+    """ Writes the stats of every pool member in the snapshot to a .csv
+        file, streaming the member records from the memory mapped file.
+    """
+
+    snap = open_snapshot(snapshot_file)
+    try:
+        with open(filename, 'w') as file:
+            file.write(','.join(['Pool Name', 'Pool Member Id']
+                                + STAT_NAMES) + '\n')
+            for pool_name, mem_id, stats in iter_snapshot_members(snap):
+                file.write(','.join([pool_name, mem_id]
+                                    + [str(stats[stat])
+                                       for stat in STAT_NAMES]) + '\n')
+    finally:
+        close_snapshot(snap)
+
+
+def export_poolmem_menu(snapshot_file):
+
+    """ Ask the user for the filename, then write the stats of every pool
+        member in the snapshot, once per pool, to a .csv file.
+    """
+
+    from .engine import get_filename
+
+    message = ('\n\nPlease enter the name of the file you wish to save '
+               'without the file extension,\nthe date and time will be '
+               'suffixed to the filename: ')
+    filename, dt_str = get_filename(message)
+    filename = filename + '_' + dt_str + '.csv'
+
+    export_poolmem_csv(snapshot_file, filename)
+
+    print('\nThe file has been written to timestamped ', filename,
+          ' in the local directory', sep='')
+    input('\nPress enter to return to options menu.')
+
+
+def print_pool_members(snap):
+
+    """ Ask the user for a pool name and print its pool members stats """
+
+    # Ask user to input the pool name
+    pool_mems = None
+    while pool_mems is None:
+
+        os.system('cls')
+        pool_name = input('\n\nThe pool name is case sensitive, include the '
+                          'partition, e.g. /Common/pool_app.\n\nPlease '
+                          'enter the name of the pool: ')
+        pool_mems = snapshot_pool_members(snap, pool_name)
+        if pool_mems is None:
+            input('\nPool does not exist, press enter to try again.')
+
+    os.system('cls')
+    print('\nLTM Pool: ', pool_name)
+    for mem in pool_mems:
+        for mem_id, stats in mem.items():
+            print('\n    Pool Member: ', mem_id)
+            for stat in STAT_NAMES:
+                print('        {}: {}'.format(stat, stats[stat]))
+
+    input('\nPress enter to return to options menu.')
+
+
+def snapshot_menu():
+    # Setup Snapshot Menu Loop
+
+    os.system('cls')
+    print(
+        """
+        Options Menu
+        -------------
+
+        Q - Quit.
+        1 - Write the active virtual servers to a file.
+        2 - Write the inactive virtual servers to a file.
+        3 - Write all LTM pool member stats.
+        4 - Print a virtual servers pool members stats to the screen.
+        5 - Write all reports in a single pass, optionally compressed.
+        6 - Write the pool member stats once per pool to a file.
+        7 - Print a pools members stats to the screen.
+        8 - Write the top or bottom N virtual servers or pool members.
+        """
+    )
+
+    sm_choice = input("Choice: ").lower()
+    print()
+
+    return sm_choice
+
+
+def run():
+
+    """ Main Program, reports from a snapshot without contacting the LTM """
+
+    from .engine import write_api, write_poolmem_stats, print_poolmem_stats
+
+    snapshot_file = input('\nPlease enter the name of the snapshot file: ')
+    snap = open_snapshot(snapshot_file)
+
+    wm_val = None
+    while wm_val != 'q':
+        wm_val = snapshot_menu()
+        match wm_val:
+            case '1':
+                os.system('cls')
+                print('\nWriting active virtual servers to a .csv file')
+                write_api(SnapshotVirts(snap, active=True), 'active')
+            case '2':
+                os.system('cls')
+                print('\nWriting inactive virtual servers to a .csv file')
+                write_api(SnapshotVirts(snap, active=False), 'inactive')
+            case '3':
+                os.system('cls')
+                print('\nWriting LTM pool member stats to a .csv')
+                write_poolmem_stats(SnapshotVirts(snap))
+            case '4':
+                os.system('cls')
+                print('\nPrinting virtual servers pool members stats.')
+                print_poolmem_stats(SnapshotVirts(snap))
+            case '5':
+                from .reports import write_all_reports_menu
+                os.system('cls')
+                print('\nWriting all reports to .csv files')
+                write_all_reports_menu(SnapshotVirts(snap),
+                                       SnapshotVirts(snap, active=True))
+            case '6':
+                os.system('cls')
+                print('\nWriting the pool member stats once per pool to a '
+                      '.csv')
+                export_poolmem_menu(snapshot_file)
+            case '7':
+                os.system('cls')
+                print_pool_members(snap)
+            case '8':
+                from .topn import write_top_n_menu
+                os.system('cls')
+                print('\nWriting the top or bottom N to a .csv file')
+                write_top_n_menu(SnapshotVirts(snap),
+                                 SnapshotVirts(snap, active=True),
+                                 members=(('',) + record for record
+                                          in iter_snapshot_members(snap)))
+            case 'q':
+                break
+            case _:
+                os.system('cls')
+                print('\nInvalid input please try again.')
+                input('\nPress Enter to try again.')
+
+    close_snapshot(snap)
+    input('\nPress enter to exit script ')
@@ -0,0 +1,184 @@
+""" Top N busiest and bottom N quietest virtual servers or pool members by a
+    serverside counter.
+
+    Rather than sorting every record, the records are streamed through a
+    bounded heap of N entries, O(n log N) time and O(N) memory. The results
+    of several devices (or snapshots) can be merged with 'merge_top_n'.
+
+    Virtual servers are ranked by the sum of their pool members' stats.
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+import os
+import heapq
+import itertools
+from .engine import STAT_NAMES, virt_pools
+
+
+MEMBER_CSV_HEADER = ['Rank', 'Device', 'Pool Name', 'Pool Member Id']
+VIRT_CSV_HEADER = ['Rank', 'Device', 'Virtual Server', 'Pool Name']
+
+
+def iter_member_records(virt_dict, device=''):
+
+    """ Yields each pool member in the passed dictionary (as returned by
+        'xref_pools') once, as a tuple of device, pool name, member id and
+        stats. Pools shared by several virtual servers are only yielded once.
+    """
+
+    # Intialise variables
+    seen_pools = set()
+
+    for virt, values in virt_dict.items():
+        for pool_name, pool_mems in virt_pools(values):
+            if pool_name in seen_pools:
+                continue
+            seen_pools.add(pool_name)
+            for mem in pool_mems:
+                for mem_id, stats in mem.items():
+                    if mem_id:
+                        yield device, pool_name, mem_id, stats
+
+
+def iter_virt_records(virt_dict, device=''):
+
+    """ Yields each virtual server in the passed dictionary as a tuple of
+        device, virtual server name, the list of its pool names and the
+        summed stats of its pool members.
+    """
+
+    for virt, values in virt_dict.items():
+        totals = dict.fromkeys(STAT_NAMES, 0)
+        for mem in values['virt_pool']['pool_mems']:
+            for mem_id, stats in mem.items():
+                for stat in STAT_NAMES:
+                    totals[stat] += stats.get(stat, 0)
+        pool_names = [pool_name for pool_name, pool_mems
+                      in virt_pools(values)]
+        yield device, virt, pool_names, totals
+
+
+def top_n(records, stat, count, largest=True):
+
+    """ Returns the 'count' records with the largest (or smallest) value of
+        'stat', largest (or smallest) first. A record is any tuple whose last
+        item is its stats dictionary. Ties keep the first record seen.
+    """
+
+    # Intialise variables
+    heap = []
+    order = itertools.count()
+    sign = 1 if largest else -1
+
+    if count <= 0:
+        return []
+
+    # The heap root is the weakest record kept so far
+    for record in records:
+        entry = (sign * record[-1].get(stat, 0), -next(order), record)
+        if len(heap) < count:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    return [record for value, seq, record in sorted(heap, reverse=True)]
+
+
+def merge_top_n(results, stat, count, largest=True):
+
+    """ Merges the 'top_n' results of several devices into the overall top
+        (or bottom) 'count' records.
+    """
+
+    return top_n(itertools.chain.from_iterable(results), stat, count, largest)
+
+
+def write_top_n(records, stat, filename, header):
+
+    """ Write ranked records to the named .csv file, the ranked stat after the
+        record's names. A list of names, such as a virtual server's pools, is
+        written space separated.
+    """
+
+    with open(filename, 'w') as file:
+        file.write(','.join(header + [stat]) + '\n')
+        for rank, record in enumerate(records, 1):
+            line = [str(rank)] + [' '.join(value) if isinstance(value, list)
+                                  else str(value) for value in record[:-1]]
+            line.append(str(record[-1].get(stat, 0)))
+            file.write(','.join(line) + '\n')
+
+
+def get_top_n_options():
+
+    """ Ask the user what to rank, returns a tuple of whether to rank pool
+        members, the stat, the count and whether to take the largest.
+    """
+
+    kind = input('\nRank virtual servers or pool members? (v/m): ').lower()
+    while kind not in ('v', 'm'):
+        kind = input('Please enter v or m: ').lower()
+
+    print()
+    for number, stat in enumerate(STAT_NAMES, 1):
+        print('{} - {}'.format(number, stat))
+    stat_choice = input('\nRank by which stat? (1-{}): '
+                        .format(len(STAT_NAMES)))
+    while (not stat_choice.isdigit()
+           or not 1 <= int(stat_choice) <= len(STAT_NAMES)):
+        stat_choice = input('Please enter a number from 1 to {}: '
+                            .format(len(STAT_NAMES)))
+
+    count = input('\nHow many to report? ')
+    while not count.isdigit() or int(count) == 0:
+        count = input('Please enter a number greater than 0: ')
+
+    end = input('\nBusiest or quietest? (b/q): ').lower()
+    while end not in ('b', 'q'):
+        end = input('Please enter b or q: ').lower()
+
+    return (kind == 'm', STAT_NAMES[int(stat_choice) - 1], int(count),
+            end == 'b')
+
+
+def write_top_n_menu(virt_dict, virt_act_dict, device='', members=None):
+
+    """ Ask the user what to rank and write the top or bottom N virtual
+        servers or pool members to a .csv file. Virtual servers can be
+        limited to the active ones in 'virt_act_dict'. 'members' optionally
+        replaces the member records of 'virt_dict', e.g. streamed from a
+        snapshot.
+    """
+
+    from .engine import get_filename
+
+    rank_members, stat, count, largest = get_top_n_options()
+
+    if rank_members:
+        records = (members if members is not None
+                   else iter_member_records(virt_dict, device))
+        header = MEMBER_CSV_HEADER
+        suffix = '_members'
+    else:
+        active = input('\nActive virtual servers only? (y/n): ').lower()
+        records = iter_virt_records(virt_act_dict if active == 'y'
+                                    else virt_dict, device)
+        header = VIRT_CSV_HEADER
+        suffix = '_virtuals'
+    suffix += '_top_' if largest else '_bottom_'
+
+    message = ('\n\nPlease enter the name of the file you wish to save '
+               'without the file extension,\nthe ranking will be '
+               'suffixed to the filename along with the date and time: ')
+    filename, dt_str = get_filename(message)
+    filename = filename + suffix + str(count) + '_' + dt_str + '.csv'
+    os.system('cls')
+
+    write_top_n(top_n(records, stat, count, largest), stat, filename, header)
+
+    print('\nThe file has been written to timestamped ', filename,
+          ' in the local directory', sep = '')
+    input('\nPress enter to return to options menu.')
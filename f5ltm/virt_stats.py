@@ -0,0 +1,100 @@
+""" Classifies F5 LTM Virtual Servers as active or inactive from their own
+    clientside stats. This is one much smaller API response than the pool
+    member stats and also covers Virtual Servers without a default pool (iRule
+    or policy routed).
+
+    The pool member stats walk done by 'xref_pools' is then only needed for
+    the Virtual Servers with a default pool that show no clientside traffic,
+    as their pool may still be in use by another Virtual Server.
+
+    This module expects the following API URLs as follows:
+
+        https://<ip-address>/mgmt/tm/ltm/virtual/stats
+"""
+
+# Author: Wayne Bellward
+# Date: 19/10/2026
+
+
+from .selection import count_pools, fetch_selected_stats
+
+
+# Clientside stats used to evaluate a virtual server as active or inactive
+CLIENTSIDE_STATS = ['clientside.bitsIn', 'clientside.bitsOut',
+                    'clientside.curConns', 'clientside.maxConns',
+                    'clientside.pktsIn', 'clientside.pktsOut',
+                    'clientside.totConns']
+
+
+def clientside_counters(virt_stats):
+
+    """ Takes the 'virtual/stats' response and returns a dictionary of virtual
+        server name to its clientside stats, e.g.
+
+            {'vs_app': {'clientside_bitsin': 8000, ...}}
+    """
+
+    # Intialise variables
+    counters = {}
+
+    for entry in virt_stats.get('entries', {}).values():
+        stats = entry['nestedStats']['entries']
+        virt_name = stats['tmName']['description'].split('/')[-1]
+        counters[virt_name] = {stat.replace('.', '_').lower():
+                               stats[stat]['value']
+                               for stat in CLIENTSIDE_STATS if stat in stats}
+
+    return counters
+
+
+def virt_activity(virt_stats):
+
+    """ Takes the 'virtual/stats' response and returns a dictionary of virtual
+        server name to True if any of its clientside stats are not 0.
+    """
+
+    return {virt_name: any(value != 0 for value in stats.values())
+            for virt_name, stats in clientside_counters(virt_stats).items()}
+
+
+def classify_clientside(virt_dict, virt_stats, walk=True):
+
+    """ Splits the virt_dict into active and inactive dictionaries based on
+        the virtual servers clientside stats. If 'walk' is True, virtual
+        servers with a pool and no clientside traffic are returned in a third
+        dictionary, to be cross referenced against the pool member stats.
+
+        Each virtual server's clientside stats are added to its values as
+        'virt_clientside', for the dormancy index.
+    """
+
+    # Intialise variables
+    virt_act_dict = {}
+    virt_inact_dict = {}
+    virt_walk_dict = {}
+
+    counters = clientside_counters(virt_stats)
+
+    for virt, values in virt_dict.items():
+        has_pool = values['virt_pool']['pool_name'] != 'NO POOL CONFIGURED'
+        values['virt_clientside'] = counters.get(virt, {})
+        if any(values['virt_clientside'].values()):
+            virt_act_dict[virt] = values
+        elif walk and has_pool:
+            virt_walk_dict[virt] = values
+        else:
+            virt_inact_dict[virt] = values
+
+    return virt_act_dict, virt_inact_dict, virt_walk_dict
+
+
+def collect_walk_stats(api_get, virt_walk_dict):
+
+    """ Fetches the LTM Pool stats for only the pools of the virtual servers
+        that still need the pool member stats walk.
+    """
+
+    pools = {values['virt_pool']['pool_name']
+             for values in virt_walk_dict.values()}
+
+    return fetch_selected_stats(api_get, pools, count_pools(api_get))
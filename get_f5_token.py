@@ -5,28 +5,14 @@
 # Author: Wayne Bellward
 # Date: 08/12/2022
 
-import requests
-
 
 def get_token(username, passwd, ipaddr):
 
     """ Get F5 authentication token """
 
-    body = {
-        "username": username,
-        "password": passwd,
-        "loginProviderName": "tmos"
-    }
-
-    token_response = requests.post(
-        f'https://{ipaddr}/mgmt/shared/authn/login',
-        verify=False,
-        auth=(username, passwd),json=body)\
-        .json()
+    from f5ltm.auth import get_token
 
-    token = token_response['token']['token']
-
-    return token
+    return get_token(username, passwd, ipaddr)
 
 
 def main():
@@ -40,4 +26,3 @@ def main():
 if __name__ == "__main__":
 
     main()
-